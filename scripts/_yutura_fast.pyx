@@ -0,0 +1,42 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Optional compiled versions of the build_yutura_features hot helpers.
+
+Build in place (needs Cython and a C compiler):
+  cythonize -i scripts/_yutura_fast.pyx
+
+build_yutura_features imports this module when it is built and otherwise
+uses its pure-Python tokenize / jaccard_sets.
+"""
+import re
+
+cdef object WS_RE = re.compile(r'[\s\u00A0]+')
+cdef object TOKEN_RE = re.compile(r'[一-龥ぁ-んァ-ヴー]+|[A-Za-z0-9]+')
+
+
+cpdef list tokenize(object s):
+    """Same as build_yutura_features.tokenize: normalize then split into Japanese runs / ascii words."""
+    cdef str t
+    if not isinstance(s, str):
+        return []
+    t = (<str>s).strip().replace('\u3000', ' ')
+    return TOKEN_RE.findall(WS_RE.sub(' ', t))
+
+
+cpdef double jaccard_sets(set a, set b):
+    """Jaccard similarity of two token sets (0.0 if either is empty)."""
+    cdef Py_ssize_t inter = 0
+    cdef Py_ssize_t la, lb
+    cdef set small, big
+    la = len(a)
+    lb = len(b)
+    if la == 0 or lb == 0:
+        return 0.0
+    if la <= lb:
+        small, big = a, b
+    else:
+        small, big = b, a
+    for x in small:
+        if x in big:
+            inter += 1
+    return inter / <double>(la + lb - inter)
@@ -9,6 +9,7 @@ analyze_titles.py
 import csv
 from pathlib import Path
 from collections import Counter
+import re
 import sys
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -27,6 +28,10 @@ except Exception:
     print("scikit-learn is required. Install with: pip install scikit-learn")
     sys.exit(1)
 
+TOKENIZER = Tokenizer()
+# TfidfVectorizer の既定 token_pattern。トークン単位で適用し、join→再分割と同じ語彙にする
+WORD_RE = re.compile(r"(?u)\b\w\w+\b")
+
 def load_titles(in_csv: Path):
     titles = []
     with in_csv.open("r", encoding="utf-8") as f:
@@ -36,12 +41,16 @@ def load_titles(in_csv: Path):
     return titles
 
 def tokenize_japanese(texts):
-    t = Tokenizer()
-    docs = []
+    """タイトルごとのトークンリストを返す（TfidfVectorizer に analyzer=恒等関数 で直接渡す）
+
+    重複タイトルは一度だけ形態素解析し、結果を使い回す。
+    """
+    cache = {}
     for txt in texts:
-        tokens = [tok.surface for tok in t.tokenize(txt) if tok.part_of_speech.split(',')[0] in ('名詞','動詞','形容詞')]
-        docs.append(' '.join(tokens))
-    return docs
+        if txt not in cache:
+            cache[txt] = [w for tok in TOKENIZER.tokenize(txt) if tok.part_of_speech.split(',')[0] in ('名詞','動詞','形容詞')
+                          for w in WORD_RE.findall(tok.surface.lower())]
+    return [cache[txt] for txt in texts]
 
 def main():
     if not IN_CSV.exists():
@@ -49,7 +58,7 @@ def main():
         return
     titles = load_titles(IN_CSV)
     docs = tokenize_japanese(titles)
-    vec = TfidfVectorizer(max_features=1000)
+    vec = TfidfVectorizer(max_features=1000, analyzer=lambda x: x)
     X = vec.fit_transform(docs)
     feature_names = vec.get_feature_names_out()
     # Sum tfidf across documents to get global importance
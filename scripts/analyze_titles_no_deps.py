@@ -7,12 +7,19 @@ analyze_titles_no_deps.py
 正規表現で日本語（漢字・ひらがな・カタカナ）と英単語を抽出し、TF-IDFを自前実装して上位語を出力します。
 
 出力: yt_trend/title_tfidf_top20_nondeps.csv
+
+numpy があれば集計を配列演算で行い、無ければ純 Python 実装にフォールバックします。
 """
 import csv
 from pathlib import Path
 import re
 import math
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 ROOT = Path(__file__).resolve().parents[1]
 IN_CSV = ROOT / "yt_trend" / "trending_titles_50.csv"
 OUT_CSV = ROOT / "yt_trend" / "title_tfidf_top20_nondeps.csv"
@@ -35,10 +42,31 @@ def load_titles(path):
     return docs
 
 def tokenize(text):
-    return [m.group(0) for m in TOK_RE.finditer(text)]
+    return TOK_RE.findall(text)
+
+def build_tfidf_numpy(tokenized):
+    # 語彙は初出順に採番（同点時の並びを純 Python 版と揃えるため）
+    vocab = {}
+    ids = [[vocab.setdefault(t, len(vocab)) for t in tokens] for tokens in tokenized]
+    N, V = len(tokenized), len(vocab)
+    if V == 0:
+        return {}
+    lengths = np.array([len(x) for x in ids], dtype=np.int64)
+    term = np.fromiter((i for x in ids for i in x), dtype=np.int64, count=int(lengths.sum()))
+    doc = np.repeat(np.arange(N, dtype=np.int64), lengths)
+    # (文書, 語) ごとの出現回数
+    keys, counts = np.unique(doc * V + term, return_counts=True)
+    pair_doc, pair_term = keys // V, keys % V
+    df = np.bincount(pair_term, minlength=V)
+    idf = np.log(N / df + 1)
+    tf = counts / lengths[pair_doc]
+    scores = np.bincount(pair_term, weights=tf * idf[pair_term], minlength=V)
+    return dict(zip(vocab, scores.tolist()))
 
 def build_tfidf(docs):
     tokenized = [tokenize(d) for d in docs]
+    if np is not None:
+        return build_tfidf_numpy(tokenized)
     N = len(tokenized)
     df = {}
     tfs = []
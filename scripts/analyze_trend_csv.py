@@ -8,6 +8,7 @@ analyze_trend_csv.py
 
 使い方:
   python scripts/analyze_trend_csv.py --in trend_data/trending_...csv
+  python scripts/analyze_trend_csv.py --in trend_data/trending_...csv --workers 4  # 形態素解析を並列化
 
 出力:
   - yt_trend/title_tfidf_top20.csv
@@ -16,34 +17,80 @@ analyze_trend_csv.py
 """
 import argparse
 import csv
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+import re
+import string
 import pandas as pd
 import sys
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 ROOT = Path(__file__).resolve().parents[1]
 OUT_DIR = ROOT / 'yt_trend'
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 
-def load_df(path: Path):
-    return pd.read_csv(path, encoding='utf-8-sig')
+# Unicode ranges are written as plain (non-raw) escapes so pandas' pyarrow/RE2 backend accepts them too
+TOK_PATTERNS = ["[\u4E00-\u9FFF]+", "[\u3040-\u309F]+", "[\u30A0-\u30FF]+", r"[A-Za-z]+", r"[0-9]+"]
+TOK_RE = re.compile("|".join(TOK_PATTERNS))
+NUM_RE = re.compile(r"[0-9]")
+# 英字・ASCII 記号の個数は UTF-8 バイト列から該当バイトを削除した長さの差で数える
+# （マルチバイト文字のバイト列に ASCII バイトは現れないので文字数と一致する）
+ENG_BYTES = string.ascii_letters.encode()
+PUNC_BYTES = string.punctuation.encode()
+# sklearn's default token_pattern, applied per janome token
+WORD_RE = re.compile(r"(?u)\b\w\w+\b")
+
+# 解析で参照する列だけを読み込む（description/tags など重い列はパースしない）
+USE_COLUMNS = ['videoId', 'title', 'channelTitle', 'viewCount', 'snapshot_at_utc']
+
+def load_df(path: Path, columns=USE_COLUMNS):
+    if columns is None:
+        return pd.read_csv(path, encoding='utf-8-sig')
+    wanted = set(columns)
+    return pd.read_csv(path, encoding='utf-8-sig', usecols=lambda c: c in wanted)
+
+def count_ascii(encoded, chars):
+    """UTF-8 バイト列 encoded に含まれる chars（ASCII バイト）の個数"""
+    return len(encoded) - len(encoded.translate(None, chars))
 
 def tokenize_japanese_simple(text):
-    import re
-    TOK_PATTERNS = [r"[\u4E00-\u9FFF]+", r"[\u3040-\u309F]+", r"[\u30A0-\u30FF]+", r"[A-Za-z]+", r"[0-9]+"]
-    TOK_RE = re.compile("|".join(TOK_PATTERNS))
-    return [m.group(0) for m in TOK_RE.finditer(text or "")]
+    return TOK_RE.findall(text or "")
+
+_TOKENIZER = None
+
+def get_tokenizer():
+    """janome の Tokenizer を一度だけ生成して使い回す"""
+    global _TOKENIZER
+    if _TOKENIZER is None:
+        from janome.tokenizer import Tokenizer
+        _TOKENIZER = Tokenizer()
+    return _TOKENIZER
 
-def compute_tfidf(titles):
+def janome_tokens(txt):
+    """名詞・動詞・形容詞のみを残したトークン列（プロセスプールのワーカーからも呼ばれる）"""
+    # WORD_RE per token keeps the vocabulary identical to the old join/re-split path
+    return [w for tok in get_tokenizer().tokenize(txt or "") if tok.part_of_speech.split(',')[0] in ('名詞','動詞','形容詞')
+            for w in WORD_RE.findall(tok.surface.lower())]
+
+def compute_tfidf(titles, workers=1):
     # Prefer janome + sklearn if available
     try:
-        from janome.tokenizer import Tokenizer
         from sklearn.feature_extraction.text import TfidfVectorizer
-        t = Tokenizer()
-        docs = []
-        for txt in titles:
-            tokens = [tok.surface for tok in t.tokenize(txt or "") if tok.part_of_speech.split(',')[0] in ('名詞','動詞','形容詞')]
-            docs.append(' '.join(tokens))
-        vec = TfidfVectorizer(max_features=1000)
+        get_tokenizer()
+        # 同じタイトルはスナップショット間で繰り返し現れるので、形態素解析はユニークなタイトルだけ行う
+        uniq = list(dict.fromkeys(titles))
+        if workers > 1:
+            # janome は純 Python で GIL を握るため、プロセスに分散する
+            with ProcessPoolExecutor(workers) as ex:
+                cache = dict(zip(uniq, ex.map(janome_tokens, uniq, chunksize=256)))
+        else:
+            cache = {txt: janome_tokens(txt) for txt in uniq}
+        docs = [cache[txt] for txt in titles]
+        vec = TfidfVectorizer(max_features=1000, analyzer=lambda x: x)
         X = vec.fit_transform(docs)
         feature_names = vec.get_feature_names_out()
         scores = X.sum(axis=0).A1
@@ -53,26 +100,28 @@ def compute_tfidf(titles):
     except Exception:
         # fallback simple implementation
         from collections import Counter
-        token_lists = [tokenize_japanese_simple(t or "") for t in titles]
-        df = len(token_lists)
+        cache = {}
+        for t in titles:
+            if t not in cache:
+                cache[t] = tokenize_japanese_simple(t or "")
+        token_lists = [cache[t] for t in titles]
+        import math
+        # 文書頻度と語頻度を 1 パスで集計
+        n_docs = len(token_lists)
         dfreq = {}
         tfs = []
         for tokens in token_lists:
-            counts = {}
-            for tok in tokens:
-                counts[tok] = counts.get(tok, 0) + 1
+            counts = Counter(tokens)
             tfs.append((counts, len(tokens)))
-            for tok in set(tokens):
+            for tok in counts:
                 dfreq[tok] = dfreq.get(tok, 0) + 1
-        import math
-        idf = {t: math.log((df / dfreq[t]) + 1) for t in dfreq}
+        idf = {t: math.log((n_docs / dfreq[t]) + 1) for t in dfreq}
         scores = {}
         for counts, total in tfs:
             if total == 0:
                 continue
             for t, c in counts.items():
-                tf = c / total
-                scores[t] = scores.get(t, 0.0) + tf * idf.get(t, 0.0)
+                scores[t] = scores.get(t, 0.0) + (c / total) * idf[t]
         items = sorted(scores.items(), key=lambda x: x[1], reverse=True)
         return items[:20]
 
@@ -83,47 +132,57 @@ def save_top20(pairs, out_path: Path):
         for term, score in pairs:
             writer.writerow([term, score])
 
+def build_keyword_matcher(top_lower):
+    """小文字化済みタイトルを受け取り、上位語ごとの 0/1 リストを返す関数を作る"""
+    if ahocorasick is None or not top_lower:
+        def match(lowered):
+            return [int(tl in lowered) for _, tl in top_lower]
+        return match
+    automaton = ahocorasick.Automaton()
+    for i, (_, tl) in enumerate(top_lower):
+        automaton.add_word(tl, automaton.get(tl, ()) + (i,))
+    automaton.make_automaton()
+    k = len(top_lower)
+    def match(lowered):
+        hits = [0] * k
+        for _, idxs in automaton.iter(lowered):
+            for i in idxs:
+                hits[i] = 1
+        return hits
+    return match
+
 def extract_title_features(df: pd.DataFrame, top_terms):
-    import re
-    TOK_RE = re.compile(r"[\u4E00-\u9FFF]+|[\u3040-\u309F]+|[\u30A0-\u30FF]+|[A-Za-z]+|[0-9]+")
-    ENG_RE = re.compile(r"[A-Za-z]")
-    NUM_RE = re.compile(r"[0-9]")
-    PUNC_RE = re.compile(r'[!"#$%&\'"()*+,\-./:;<=>?@\[\\\]^_`{|}~]')
-
-    def tokenize(text):
-        return [m.group(0) for m in TOK_RE.finditer(text or "")]
-
-    rows = []
-    for _, row in df.iterrows():
-        title = row.get('title', '') or ''
-        chars = len(title)
-        tokens = tokenize(title)
-        word_count = len(tokens)
-        eng_chars = len(ENG_RE.findall(title))
-        english_ratio = eng_chars / chars if chars>0 else 0.0
-        has_number = int(bool(NUM_RE.search(title)))
-        punc_count = len(PUNC_RE.findall(title))
-        lowered = title.lower()
-        feats = {
-            'videoId': row.get('videoId',''),
-            'title': title,
-            'channelTitle': row.get('channelTitle',''),
-            'viewCount': row.get('viewCount',''),
-            'snapshot_at_utc': row.get('snapshot_at_utc',''),
-            'title_len_chars': chars,
-            'title_word_count': word_count,
-            'english_ratio': round(english_ratio,4),
-            'has_number': has_number,
-            'punctuation_count': punc_count
-        }
-        for t, _ in top_terms:
-            feats[f'top_keyword_{t}'] = int(t.lower() in lowered)
-        rows.append(feats)
-    return pd.DataFrame(rows)
+    s = df['title'].fillna('').astype(str) if 'title' in df.columns else pd.Series([''] * len(df), index=df.index)
+    chars = s.str.len()
+    encoded = [t.encode('utf-8', 'surrogatepass') for t in s]
+    eng_chars = pd.Series([count_ascii(b, ENG_BYTES) for b in encoded], index=s.index)
+    english_ratio = (eng_chars / chars.where(chars > 0)).fillna(0.0).round(4)
+    out = pd.DataFrame({
+        'videoId': df['videoId'] if 'videoId' in df.columns else '',
+        'title': s,
+        'channelTitle': df['channelTitle'] if 'channelTitle' in df.columns else '',
+        'viewCount': df['viewCount'] if 'viewCount' in df.columns else '',
+        'snapshot_at_utc': df['snapshot_at_utc'] if 'snapshot_at_utc' in df.columns else '',
+        'title_len_chars': chars,
+        'title_word_count': s.str.count(TOK_RE),
+        'english_ratio': english_ratio,
+        'has_number': s.str.contains(NUM_RE).astype(int),
+        'punctuation_count': [count_ascii(b, PUNC_BYTES) for b in encoded],
+    }, index=df.index)
+
+    # top keyword flags still need a per-title scan (one automaton pass per unique title)
+    top_lower = [(t, t.lower()) for t, _ in top_terms]
+    match = build_keyword_matcher(top_lower)
+    lowered = s.str.lower()
+    hit_cache = {t: match(t) for t in pd.unique(lowered)}
+    hits = pd.DataFrame([hit_cache[t] for t in lowered],
+                        columns=[f'top_keyword_{t}' for t, _ in top_lower], index=df.index)
+    return pd.concat([out, hits], axis=1).reset_index(drop=True)
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--in', dest='infile', required=True)
+    parser.add_argument('--workers', type=int, default=1, help='形態素解析に使うプロセス数')
     args = parser.parse_args()
     in_path = Path(args.infile)
     if not in_path.exists():
@@ -137,7 +196,7 @@ def main():
         print(df['viewCount'].describe())
     # titles
     titles = df['title'].fillna('').tolist()
-    top20 = compute_tfidf(titles)
+    top20 = compute_tfidf(titles, workers=args.workers)
     out_top20 = OUT_DIR / 'title_tfidf_top20.csv'
     save_top20(top20, out_top20)
     print('\nWrote TF-IDF top20 to:', out_top20)
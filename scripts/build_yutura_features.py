@@ -12,16 +12,55 @@ Features produced (per videoId):
 - days_since_last_mention_3d
  (and same for 7d suffix)
 
-This is intentionally simple and dependency-light.
+This is intentionally simple and dependency-light. When scipy is available the
+video x article Jaccard scores are computed with one sparse matrix product;
+without scipy a numba-compiled kernel is used if numba is installed, otherwise
+a pure-Python loop (using scripts/_yutura_fast.pyx for tokenize/Jaccard when
+it has been built with `cythonize -i`).
 """
 import argparse
+import csv
+import hashlib
+import operator
 import os
+import pickle
 import re
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime, timedelta
-from collections import defaultdict
 
+import numpy as np
 import pandas as pd
 
+try:
+    from scipy import sparse
+except ImportError:
+    sparse = None
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    # optional Cython build of tokenize / jaccard_sets: cythonize -i scripts/_yutura_fast.pyx
+    import _yutura_fast
+except ImportError:
+    _yutura_fast = None
+
+
+WS_RE = re.compile(r'[\s\u00A0]+')
+# Japanese runs or ascii words/numbers
+TOKEN_RE = re.compile(r'[一-龥ぁ-んァ-ヴー]+|[A-Za-z0-9]+')
+FILE_DATE_RE = re.compile(r'(20\d{6})')
+ARTICLE_DATE_RE = re.compile(r'(20\d{2})\D?(\d{1,2})\D?(\d{1,2})')
+
 
 def normalize_text(s: str) -> str:
     if not isinstance(s, str):
@@ -29,15 +68,12 @@ def normalize_text(s: str) -> str:
     s = s.strip()
     # to half-width for ascii digits/letters roughly
     s = s.replace('\u3000', ' ')
-    s = re.sub(r'[\s\u00A0]+', ' ', s)
+    s = WS_RE.sub(' ', s)
     return s
 
 
 def tokenize(s: str):
-    s = normalize_text(s)
-    # extract Japanese runs or ascii words/numbers
-    toks = re.findall(r'[一-龥ぁ-んァ-ヴー]+|[A-Za-z0-9]+', s)
-    return [t for t in toks if t]
+    return TOKEN_RE.findall(normalize_text(s))
 
 
 def jaccard(a, b):
@@ -50,9 +86,107 @@ def jaccard(a, b):
     return len(inter) / len(uni) if uni else 0.0
 
 
+def jaccard_sets(a: set, b: set) -> float:
+    """jaccard() for callers that already hold sets (no copies)."""
+    if not a or not b:
+        return 0.0
+    inter = len(a & b)
+    return inter / (len(a) + len(b) - inter)
+
+
+if _yutura_fast is not None:
+    tokenize = _yutura_fast.tokenize
+    jaccard_sets = _yutura_fast.jaccard_sets
+
+
+def _binary_csr(id_sets, n_cols):
+    indptr = np.zeros(len(id_sets) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(ids) for ids in id_sets])
+    indices = np.fromiter((i for ids in id_sets for i in ids), dtype=np.int32, count=int(indptr[-1]))
+    data = np.ones(len(indices), dtype=np.float64)
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(id_sets), n_cols))
+
+
+def _ragged(id_sets):
+    """Sorted int32 token ids per doc, concatenated, plus row offsets."""
+    offsets = np.zeros(len(id_sets) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(ids) for ids in id_sets])
+    data = np.fromiter((i for ids in id_sets for i in sorted(ids)), dtype=np.int32, count=int(offsets[-1]))
+    return offsets, data
+
+
+if njit is not None:
+    @njit(parallel=True, nogil=True, cache=True)
+    def _jaccard_block_nb(v_off, v_dat, rows, a_off, a_dat, cand):
+        J = np.zeros((rows.size, cand.size))
+        for r in prange(rows.size):
+            vs, ve = v_off[rows[r]], v_off[rows[r] + 1]
+            for c in range(cand.size):
+                as_, ae = a_off[cand[c]], a_off[cand[c] + 1]
+                # two-pointer intersection of sorted id runs
+                i, j, inter = vs, as_, 0
+                while i < ve and j < ae:
+                    if v_dat[i] == a_dat[j]:
+                        inter += 1
+                        i += 1
+                        j += 1
+                    elif v_dat[i] < a_dat[j]:
+                        i += 1
+                    else:
+                        j += 1
+                union = (ve - vs) + (ae - as_) - inter
+                if union > 0:
+                    J[r, c] = inter / union
+        return J
+
+
+def encode_titles(v_tokens, a_tokens):
+    """Encode token lists over a shared vocab for whichever Jaccard backend is available.
+
+    scipy: binary CSR matrices; numba: (offsets, sorted ids) pairs; otherwise plain sets.
+    """
+    if sparse is None and njit is None:
+        return [set(t) for t in v_tokens], [set(t) for t in a_tokens]
+    vocab = {}
+    v_ids = [{vocab.setdefault(t, len(vocab)) for t in toks} for toks in v_tokens]
+    a_ids = [{vocab.setdefault(t, len(vocab)) for t in toks} for toks in a_tokens]
+    if sparse is None:
+        return _ragged(v_ids), _ragged(a_ids)
+    return _binary_csr(v_ids, len(vocab)), _binary_csr(a_ids, len(vocab))
+
+
+def jaccard_block(V, A, rows, cand):
+    """Jaccard similarity of encoded videos `rows` (rows) against encoded articles `cand` (cols)."""
+    if sparse is not None:
+        Vb, Ab = V[rows], A[cand]
+        inter = (Vb @ Ab.T).toarray()
+        union = np.diff(Vb.indptr)[:, None] + np.diff(Ab.indptr)[None, :] - inter
+        return np.divide(inter, union, out=np.zeros(inter.shape), where=union > 0)
+    if njit is not None:
+        return _jaccard_block_nb(V[0], V[1], rows, A[0], A[1], cand)
+    J = np.zeros((len(rows), len(cand)))
+    for i, r in enumerate(rows):
+        for j, c in enumerate(cand):
+            J[i, j] = jaccard_sets(V[r], A[c])
+    return J
+
+
+def window_stats(J, snap_ords, art_ords, window, thr):
+    """Per video: mention count, max Jaccard and last mention ordinal (-1 if none) within window days."""
+    delta = snap_ords[:, None] - art_ords[None, :]
+    include = (delta >= 0) & (delta <= window)
+    hit = include & (J >= thr)
+    cnt = hit.sum(axis=1)
+    if J.shape[1] == 0:
+        return cnt, np.zeros(len(J)), np.full(len(J), -1)
+    max_j = np.where(include, J, 0.0).max(axis=1)
+    last = np.where(hit, art_ords[None, :], -1).max(axis=1)
+    return cnt, max_j, last
+
+
 def parse_date_from_filename(path):
     base = os.path.basename(path)
-    m = re.search(r'(20\d{6})', base)
+    m = FILE_DATE_RE.search(base)
     if m:
         return datetime.strptime(m.group(1), '%Y%m%d').date()
     return None
@@ -63,121 +197,229 @@ def article_date_from_row(row, fallback_date=None):
     d = row.get('date', '')
     if isinstance(d, str) and d.strip():
         # Try to parse like '2025年10月2日 16:51'
-        m = re.search(r'(20\d{2})\D?(\d{1,2})\D?(\d{1,2})', d)
+        m = ARTICLE_DATE_RE.search(d)
         if m:
             y,mo,da = map(int, m.groups())
             return datetime(y,mo,da).date()
     return fallback_date
 
 
-def build_features(trend_csv, yutura_csv, name_candidates_csv=None, out_csv=None):
-    df_trend = pd.read_csv(trend_csv)
-    df_yu = pd.read_csv(yutura_csv)
+TREND_COLUMNS = ['videoId', 'title', 'channelTitle', 'snapshot_at_utc']
+YUTURA_COLUMNS = ['title', 'date']
+CHUNK_ROWS = 50_000
+WINDOWS = (3, 7)
+FEATURE_COLS = [f'{name}_{w}d' for w in WINDOWS for name in
+                ('mention_count', 'mention_any', 'max_jaccard', 'channel_mentioned', 'days_since_last_mention')]
+# reducer per feature, same as the former out_df.groupby('videoId').agg(...)
+FEATURE_AGG = {'mention_count': operator.add, 'mention_any': max, 'max_jaccard': max,
+               'channel_mentioned': max, 'days_since_last_mention': min}
+
+
+def _read_columns(path, columns, **kwargs):
+    """read_csv restricted to `columns` (missing ones are tolerated and come back as NaN)."""
+    wanted = set(columns)
+    return pd.read_csv(path, usecols=lambda c: c in wanted, dtype={c: str for c in columns}, **kwargs)
 
+
+# tokenized yutura articles are cached here, keyed by file content + fallback date
+YUTURA_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'yutura')
+YUTURA_CACHE_VERSION = 1
+
+
+def _tokenize_yutura(yutura_csv, yu_file_date):
+    df_yu = _read_columns(yutura_csv, YUTURA_COLUMNS)
+    y_tokens, y_dates, y_norm_titles = [], [], []
+    for _, r in df_yu.iterrows():
+        title = r.get('title', '')
+        y_tokens.append(tokenize(title))
+        y_dates.append(article_date_from_row(r, fallback_date=yu_file_date) or yu_file_date)
+        y_norm_titles.append(normalize_text(title))
+    return y_tokens, y_dates, y_norm_titles
+
+
+def load_yutura_tokens(yutura_csv, yu_file_date, cache_dir=YUTURA_CACHE_DIR):
+    """(tokens, dates, normalized titles) per yutura article, reusing an on-disk pickle when the CSV is unchanged."""
+    if not cache_dir:
+        return _tokenize_yutura(yutura_csv, yu_file_date)
+    h = hashlib.md5()
+    with open(yutura_csv, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    h.update(f'{YUTURA_CACHE_VERSION}:{yu_file_date.isoformat()}'.encode())
+    cache_path = os.path.join(cache_dir, h.hexdigest() + '.pkl')
+    try:
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+    result = _tokenize_yutura(yutura_csv, yu_file_date)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f'Could not write yutura token cache {cache_path}: {e}')
+    return result
+
+
+def build_channel_matcher(y_norm_titles, name_candidates):
+    """Return channel_norm -> 0/1: substring of any yutura title, or contains a name candidate.
+
+    Titles are joined into one corpus string (normalized text has no newlines) and
+    candidates go into an Aho-Corasick automaton when pyahocorasick is installed.
+    Results are memoized per channel since trend snapshots repeat channels.
+    """
+    corpus = '\n'.join(y_norm_titles)
+    automaton = None
+    if ahocorasick is not None and name_candidates:
+        automaton = ahocorasick.Automaton()
+        for nc in name_candidates:
+            automaton.add_word(nc, nc)
+        automaton.make_automaton()
+    cache = {}
+
+    def match(channel_norm):
+        if not channel_norm:
+            return 0
+        hit = cache.get(channel_norm)
+        if hit is None:
+            if channel_norm in corpus:
+                hit = 1
+            elif automaton is not None:
+                hit = int(next(automaton.iter(channel_norm), None) is not None)
+            else:
+                hit = int(any(nc in channel_norm for nc in name_candidates))
+            cache[channel_norm] = hit
+        return hit
+    return match
+
+
+def _chunk_features(chunk, y_tokens, by_date, art_ords, channel_mentioned, thr=0.25):
+    """Yield (videoId, snapshot_date, feature values in FEATURE_COLS order) for one trend chunk."""
+    chunk = chunk.reindex(columns=TREND_COLUMNS)
+    videos = []
+    for vid, vtitle, vchannel, snap in chunk.itertuples(index=False, name=None):
+        try:
+            snap_date = datetime.fromisoformat(snap.replace('Z','+00:00')).date()
+        except Exception:
+            snap_date = datetime.now().date()
+        videos.append((vid, vchannel, snap_date, tokenize(vtitle)))
+
+    V, A = encode_titles([v[3] for v in videos], y_tokens)
+    # bucket articles by date so each snapshot only scores articles inside its widest window
+    by_snap = defaultdict(list)
+    for i, v in enumerate(videos):
+        by_snap[v[2]].append(i)
+    n = len(videos)
+    stats = {w: (np.zeros(n, dtype=np.int64), np.zeros(n), np.full(n, -1, dtype=np.int64)) for w in WINDOWS}
+    for snap_date, rows in by_snap.items():
+        cand = [j for k in range(max(WINDOWS) + 1) for j in by_date.get(snap_date - timedelta(days=k), ())]
+        if not cand:
+            continue
+        rows = np.asarray(rows)
+        cand = np.asarray(cand)
+        J = jaccard_block(V, A, rows, cand)
+        snap_ords = np.full(len(rows), snap_date.toordinal(), dtype=np.int64)
+        for w in WINDOWS:
+            for acc, res in zip(stats[w], window_stats(J, snap_ords, art_ords[cand], w, thr)):
+                acc[rows] = res
+
+    for i, (vid, vchannel, snap_date, _) in enumerate(videos):
+        # channel matching: substring match in yutura titles or name candidates (same for every window)
+        ch_mentioned = channel_mentioned(normalize_text(vchannel))
+
+        values = []
+        for w in WINDOWS:
+            cnt = int(stats[w][0][i])
+            last_ord = int(stats[w][2][i])
+            days_since = (snap_date.toordinal() - last_ord) if last_ord >= 0 else -1
+            values += [cnt, 1 if cnt>0 else 0, round(float(stats[w][1][i]),4), ch_mentioned, days_since]
+        yield vid, snap_date, values
+
+
+# per-process yutura state for _chunk_worker (set by _init_worker in the parent or in pool workers)
+_WORKER = {}
+
+
+def _init_worker(y_tokens, by_date, art_ords, y_norm_titles, name_candidates):
+    _WORKER['args'] = (y_tokens, by_date, art_ords, build_channel_matcher(y_norm_titles, name_candidates))
+
+
+def _chunk_worker(chunk):
+    return list(_chunk_features(chunk, *_WORKER['args']))
+
+
+def _ordered_map(executor, fn, items, window):
+    """executor.map that keeps at most `window` items in flight (so the CSV stays streamed)."""
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def build_features(trend_csv, yutura_csv, name_candidates_csv=None, out_csv=None, chunksize=CHUNK_ROWS, workers=1,
+                   cache_dir=YUTURA_CACHE_DIR):
     # infer yutura date from filename if rows lack date
     yu_file_date = parse_date_from_filename(yutura_csv)
     if yu_file_date is None:
         yu_file_date = datetime.now().date()
 
-    # prepare yutura rows with tokens and dates
-    y_rows = []
-    for _, r in df_yu.iterrows():
-        title = r.get('title', '')
-        art_date = article_date_from_row(r, fallback_date=yu_file_date)
-        toks = tokenize(title)
-        y_rows.append({'title': title, 'tokens': toks, 'date': art_date})
+    # yutura rows with tokens and dates (tokenized once per distinct CSV, see load_yutura_tokens)
+    y_tokens, y_dates, y_norm_titles = load_yutura_tokens(yutura_csv, yu_file_date, cache_dir)
+    art_ords = np.array([d.toordinal() for d in y_dates], dtype=np.int64)
+    by_date = defaultdict(list)
+    for j, d in enumerate(y_dates):
+        by_date[d].append(j)
 
     # load name candidates if provided to help channel matching
     name_candidates = set()
     if name_candidates_csv and os.path.exists(name_candidates_csv):
-        dnc = pd.read_csv(name_candidates_csv)
+        dnc = _read_columns(name_candidates_csv, ['candidate'])
         for _, r in dnc.iterrows():
             c = r.get('candidate')
             if isinstance(c, str) and c.strip():
                 name_candidates.add(c.strip())
-
-    out_rows = []
-
-    for _, v in df_trend.iterrows():
-        vid = v.get('videoId')
-        vtitle = v.get('title','')
-        vchannel = v.get('channelTitle','')
-        snap = v.get('snapshot_at_utc')
-        try:
-            snap_date = datetime.fromisoformat(snap.replace('Z','+00:00')).date()
-        except Exception:
-            snap_date = datetime.now().date()
-
-        vtoks = tokenize(vtitle)
-
-        for window in (3,7):
-            thr = 0.25
-            cnt = 0
-            max_j = 0.0
-            last_date = None
-            for yr in y_rows:
-                art_date = yr['date'] or yu_file_date
-                # include article if within window days before snapshot (0..window)
-                if art_date is None:
-                    include = True
-                else:
-                    delta = (snap_date - art_date).days
-                    include = (0 <= delta <= window)
-                if not include:
+    shared = (y_tokens, by_date, art_ords, y_norm_titles, name_candidates)
+
+    # stream the trend CSV and aggregate to one row per videoId as we go
+    # (snapshot_date from the first occurrence, counts summed, flags/jaccard max, days_since min)
+    reducers = [FEATURE_AGG[c.rsplit('_', 1)[0]] for c in FEATURE_COLS]
+    agg = {}
+    snap_date = datetime.now().date()
+    chunks = _read_columns(trend_csv, TREND_COLUMNS, chunksize=chunksize)
+    # chunks are independent, so with workers > 1 they are scored in a process pool (results kept in order)
+    pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=shared) if workers > 1 else nullcontext()
+    with pool as executor:
+        if executor is None:
+            _init_worker(*shared)
+            results = map(_chunk_worker, chunks)
+        else:
+            results = _ordered_map(executor, _chunk_worker, chunks, 2 * workers)
+        for chunk_rows in results:
+            for vid, snap_date, values in chunk_rows:
+                if pd.isna(vid):
                     continue
-                j = jaccard(vtoks, yr['tokens'])
-                if j >= thr:
-                    cnt += 1
-                    if (last_date is None) or (yr['date'] and yr['date'] > last_date):
-                        last_date = yr['date']
-                if j > max_j:
-                    max_j = j
-
-            mention_any = 1 if cnt>0 else 0
-            # channel matching: substring match in yutura titles or name candidates
-            channel_norm = normalize_text(vchannel)
-            ch_mentioned = 0
-            if channel_norm:
-                # check yutura titles
-                for yr in y_rows:
-                    if channel_norm and channel_norm in normalize_text(yr['title']):
-                        ch_mentioned = 1
-                        break
-                # check name candidates
-                if not ch_mentioned and name_candidates:
-                    for nc in name_candidates:
-                        if nc and nc in channel_norm:
-                            ch_mentioned = 1
-                            break
-
-            days_since = None
-            if last_date is not None and isinstance(last_date, (datetime,)):
-                days_since = (snap_date - last_date.date()).days
-            elif last_date is not None:
-                days_since = (snap_date - last_date).days
-
-            out_rows.append({
-                'videoId': vid,
-                'snapshot_date': snap_date.isoformat(),
-                f'mention_count_{window}d': cnt,
-                f'mention_any_{window}d': mention_any,
-                f'max_jaccard_{window}d': round(max_j,4),
-                f'channel_mentioned_{window}d': ch_mentioned,
-                f'days_since_last_mention_{window}d': (days_since if days_since is not None else -1)
-            })
-
-    out_df = pd.DataFrame(out_rows)
-    # aggregate to one row per videoId: keep snapshot_date from first
-    agg = out_df.groupby('videoId').agg({
-        'snapshot_date':'first',
-        'mention_count_3d':'sum','mention_any_3d':'max','max_jaccard_3d':'max','channel_mentioned_3d':'max','days_since_last_mention_3d':'min',
-        'mention_count_7d':'sum','mention_any_7d':'max','max_jaccard_7d':'max','channel_mentioned_7d':'max','days_since_last_mention_7d':'min'
-    }).reset_index()
+                cur = agg.get(vid)
+                if cur is None:
+                    agg[vid] = [snap_date.isoformat(), values]
+                else:
+                    cur[1] = [f(a, b) for f, a, b in zip(reducers, cur[1], values)]
 
     if out_csv is None:
         out_csv = f"data/features_yutura_{snap_date.isoformat()}.csv"
     os.makedirs(os.path.dirname(out_csv) or '.', exist_ok=True)
-    agg.to_csv(out_csv, index=False, encoding='utf-8-sig')
+    with open(out_csv, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(['videoId', 'snapshot_date'] + FEATURE_COLS)
+        for vid in sorted(agg):
+            first_date, values = agg[vid]
+            # numeric columns are written as floats, matching the previous pandas groupby output
+            writer.writerow([vid, first_date] + [float(x) for x in values])
     print(f'Wrote features to {out_csv} rows={len(agg)}')
 
 
@@ -187,9 +429,14 @@ def main():
     parser.add_argument('--yutura', required=True)
     parser.add_argument('--name-candidates', default='data/yutura_name_candidates_1-5.csv')
     parser.add_argument('--out', default=None)
+    parser.add_argument('--chunksize', type=int, default=CHUNK_ROWS, help='trend CSV rows per chunk')
+    parser.add_argument('--workers', type=int, default=1, help='processes used to score trend chunks')
+    parser.add_argument('--no-token-cache', action='store_true', help=f'do not read/write {YUTURA_CACHE_DIR}')
     args = parser.parse_args()
 
-    build_features(args.trend, args.yutura, args.name_candidates, args.out)
+    build_features(args.trend, args.yutura, args.name_candidates, args.out,
+                   chunksize=args.chunksize, workers=args.workers,
+                   cache_dir=None if args.no_token_cache else YUTURA_CACHE_DIR)
 
 
 if __name__ == '__main__':
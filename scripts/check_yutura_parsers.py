@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Compare the lexbor (selectolax) and BeautifulSoup news parsers of scrape_yutura_selenium on saved HTML.
+With no arguments it checks data/yutura_page5_selenium.html and the pages cached in data/cache.
+Prints per-item differences and exits non-zero on a mismatch.
+
+python scripts/check_yutura_parsers.py [HTML ...]
+"""
+import argparse
+import glob
+import os
+import sys
+
+from scrape_yutura_selenium import (HTML_CACHE_DIR, LexborHTMLParser, parse_news_items_bs4,
+                                    parse_news_items_lexbor)
+
+DEFAULT_HTML = 'data/yutura_page5_selenium.html'
+
+
+def check_parser_parity(paths) -> int:
+    """Parse each saved HTML file with both parsers and print where they disagree. Returns the mismatch count."""
+    mismatches = 0
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            html = f.read()
+        lex, ref = parse_news_items_lexbor(html), parse_news_items_bs4(html)
+        if lex == ref:
+            print(f'{path}: OK ({len(ref)} items)')
+            continue
+        mismatches += 1
+        print(f'{path}: MISMATCH (lexbor {len(lex)} items, bs4 {len(ref)} items)')
+        for i, (x, y) in enumerate(zip(lex, ref), start=1):
+            if x != y:
+                print(f'  #{i} lexbor={x!r}\n      bs4   ={y!r}')
+    return mismatches
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('html', nargs='*',
+                   help=f'saved HTML files (default: {DEFAULT_HTML} and pages cached in {HTML_CACHE_DIR})')
+    args = p.parse_args()
+    if LexborHTMLParser is None:
+        p.error('selectolax is not installed; only the bs4 parser is in use')
+    paths = args.html or [x for x in [DEFAULT_HTML, *sorted(glob.glob(os.path.join(HTML_CACHE_DIR, '*.html')))]
+                          if os.path.exists(x)]
+    if not paths:
+        p.error('no saved HTML found; pass file paths')
+    sys.exit(1 if check_parser_parity(paths) else 0)
@@ -14,10 +14,17 @@ extract_title_features.py
  - top_keyword_*: `title_tfidf_top20_nondeps.csv` の上位語が含まれるかのフラグ
  - punctuation_count: 記号の数
 
+pyahocorasick が入っていれば上位語フラグを Aho-Corasick で一括判定します（無ければ部分文字列検索）。
 """
 import csv
 from pathlib import Path
 import re
+import string
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 ROOT = Path(__file__).resolve().parents[1]
 IN_CSV = ROOT / "yt_trend" / "trending_titles_50.csv"
@@ -25,9 +32,11 @@ TFIDF_TOP = ROOT / "yt_trend" / "title_tfidf_top20_nondeps.csv"
 OUT_CSV = ROOT / "yt_trend" / "title_features_50.csv"
 
 TOK_RE = re.compile(r"[\u4E00-\u9FFF]+|[\u3040-\u309F]+|[\u30A0-\u30FF]+|[A-Za-z]+|[0-9]+")
-ENG_RE = re.compile(r"[A-Za-z]")
 NUM_RE = re.compile(r"[0-9]")
-PUNC_RE = re.compile(r'[!"#$%&\'()*+,\-./:;<=>?@\[\\\]^_`{|}~]')
+# 英字・ASCII 記号の個数は UTF-8 バイト列から該当バイトを削除した長さの差で数える
+# （マルチバイト文字のバイト列に ASCII バイトは現れないので文字数と一致する）
+ENG_BYTES = string.ascii_letters.encode()
+PUNC_BYTES = string.punctuation.encode()
 
 def load_top_terms(path):
     terms = []
@@ -39,47 +48,80 @@ def load_top_terms(path):
             terms.append(row['term'])
     return terms
 
+def count_ascii(encoded, chars):
+    """UTF-8 バイト列 encoded に含まれる chars（ASCII バイト）の個数"""
+    return len(encoded) - len(encoded.translate(None, chars))
+
 def tokenize(text):
-    return [m.group(0) for m in TOK_RE.finditer(text)]
+    return TOK_RE.findall(text)
+
+def build_keyword_matcher(top_lower):
+    """小文字化済みタイトルを受け取り、上位語ごとの 0/1 リストを返す関数を作る"""
+    if ahocorasick is None or not top_lower:
+        def match(lowered):
+            return [int(tl in lowered) for _, tl in top_lower]
+        return match
+    automaton = ahocorasick.Automaton()
+    for i, (_, tl) in enumerate(top_lower):
+        # 小文字化で同一になる語もあるので index はタプルで保持
+        automaton.add_word(tl, automaton.get(tl, ()) + (i,))
+    automaton.make_automaton()
+    k = len(top_lower)
+    def match(lowered):
+        hits = [0] * k
+        for _, idxs in automaton.iter(lowered):
+            for i in idxs:
+                hits[i] = 1
+        return hits
+    return match
 
-def compute_features(title, top_terms):
+BASE_COLS = ['videoId','title','channelTitle','viewCount','snapshot_at_utc']
+FEATURE_COLS = ['title_len_chars','title_word_count','english_ratio','has_number','punctuation_count']
+WRITE_BATCH = 10_000
+
+def compute_feature_values(title, match):
+    """FEATURE_COLS の値と上位語フラグを列順どおりのリストで返す"""
     title = title or ""
     chars = len(title)
     tokens = tokenize(title)
     word_count = len(tokens)
-    eng_chars = len(ENG_RE.findall(title))
+    encoded = title.encode('utf-8', 'surrogatepass')
+    eng_chars = count_ascii(encoded, ENG_BYTES)
     english_ratio = eng_chars / chars if chars>0 else 0.0
     has_number = int(bool(NUM_RE.search(title)))
-    punc_count = len(PUNC_RE.findall(title))
-    features = {
-        'title_len_chars': chars,
-        'title_word_count': word_count,
-        'english_ratio': round(english_ratio, 4),
-        'has_number': has_number,
-        'punctuation_count': punc_count
-    }
-    lowered = title.lower()
-    for t in top_terms:
-        key = f"top_keyword_{t}"
-        features[key] = int(t.lower() in lowered)
-    return features
+    punc_count = count_ascii(encoded, PUNC_BYTES)
+    return [chars, word_count, round(english_ratio, 4), has_number, punc_count] + match(title.lower())
+
+def compute_features(title, top_lower, match):
+    values = compute_feature_values(title, match)
+    keys = FEATURE_COLS + [f"top_keyword_{t}" for t, _ in top_lower]
+    return dict(zip(keys, values))
 
 def main():
     top_terms = load_top_terms(TFIDF_TOP)
+    top_lower = [(t, t.lower()) for t in top_terms]
+    match = build_keyword_matcher(top_lower)
     if not IN_CSV.exists():
         print(f"Input not found: {IN_CSV}")
         return
-    out_header = ['videoId','title','channelTitle','viewCount','snapshot_at_utc'] + ['title_len_chars','title_word_count','english_ratio','has_number','punctuation_count'] + [f"top_keyword_{t}" for t in top_terms]
+    out_header = BASE_COLS + FEATURE_COLS + [f"top_keyword_{t}" for t in top_terms]
     with IN_CSV.open('r', encoding='utf-8') as inf, OUT_CSV.open('w', encoding='utf-8', newline='') as outf:
         reader = csv.DictReader(inf)
-        writer = csv.DictWriter(outf, fieldnames=out_header)
-        writer.writeheader()
+        writer = csv.writer(outf)
+        writer.writerow(out_header)
+        # 同じタイトルの特徴量は一度だけ計算する
+        cache = {}
+        buffer = []
         for row in reader:
             title = row.get('title','')
-            feats = compute_features(title, top_terms)
-            out_row = {k: row.get(k,'') for k in ['videoId','title','channelTitle','viewCount','snapshot_at_utc']}
-            out_row.update(feats)
-            writer.writerow(out_row)
+            values = cache.get(title)
+            if values is None:
+                values = cache[title] = compute_feature_values(title, match)
+            buffer.append([row.get(k,'') for k in BASE_COLS] + values)
+            if len(buffer) >= WRITE_BATCH:
+                writer.writerows(buffer)
+                buffer.clear()
+        writer.writerows(buffer)
     print(f"Wrote features to: {OUT_CSV}")
 
 if __name__ == '__main__':
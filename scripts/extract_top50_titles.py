@@ -12,6 +12,7 @@ trending_JP_20250926.csv などのトレンドCSVから先頭50件の videoId/ti
   yt_trend/trending_titles_50.csv
 """
 import csv
+from itertools import islice
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -22,14 +23,16 @@ OUT_CSV = OUT_DIR / "trending_titles_50.csv"
 def extract_top50(in_csv: Path, out_csv: Path, n: int = 50):
     out_csv.parent.mkdir(parents=True, exist_ok=True)
     with in_csv.open("r", encoding="utf-8") as inf, out_csv.open("w", encoding="utf-8", newline="") as outf:
-        reader = csv.DictReader(inf)
+        reader = csv.reader(inf)
+        header = next(reader, [])
         fieldnames = ["snapshot_at_utc", "videoId", "title", "channelTitle", "viewCount"]
-        writer = csv.DictWriter(outf, fieldnames=fieldnames)
-        writer.writeheader()
-        for i, row in enumerate(reader):
-            if i >= n:
-                break
-            writer.writerow({k: row.get(k, "") for k in fieldnames})
+        # 列位置はヘッダから一度だけ解決（存在しない列は空文字）
+        idx = [header.index(k) if k in header else None for k in fieldnames]
+        writer = csv.writer(outf)
+        writer.writerow(fieldnames)
+        # islice で先頭 n 行だけを読む（dict は作らない）
+        for row in islice(reader, n):
+            writer.writerow([row[j] if j is not None and j < len(row) else "" for j in idx])
     print(f"Saved {n} rows to: {out_csv}")
 
 if __name__ == '__main__':
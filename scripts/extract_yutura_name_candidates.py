@@ -29,12 +29,16 @@ RE_PATTERNS = [
     # 短めの英字ニックネーム
     (re.compile(r"\b([A-Za-z0-9_]{3,30})\b"), 'channel'),
 ]
+RE_QUOTE = re.compile(r'「([^」]{2,30})」')
+RE_KATAKANA = re.compile(r'([ァ-ン]{2,20})')
+RE_KANJI = re.compile(r"[一-龥]")
+RE_SPACES = re.compile(r"[\u3000\s]+")
 
 
 def normalize_candidate(s: str) -> str:
     s = s.strip()
     # normalize spaces and punctuation
-    s = re.sub(r"[\u3000\s]+", " ", s)
+    s = RE_SPACES.sub(" ", s)
     s = s.replace('（', '(').replace('）', ')')
     return s
 
@@ -54,34 +58,28 @@ def extract_candidates_from_title(title: str) -> List[Tuple[str, str, float]]:
             cand = normalize_candidate(cand)
             # score heuristic: longer tokens and tokens with Kanji get higher score
             score = 0.6 + min(len(cand) / 20.0, 0.4)
-            if re.search(r"[一-龥]", cand):
+            if RE_KANJI.search(cand):
                 score += 0.1
             score = min(score, 1.0)
             candidates.append((cand, kind, round(score, 2)))
 
     # heuristic 2: titles containing quotes or special markers like 「」
-    quotes = re.findall(r'「([^」]{2,30})」', t)
+    quotes = RE_QUOTE.findall(t)
     for q in quotes:
         qn = normalize_candidate(q)
         candidates.append((qn, 'unknown', 0.4))
 
     # heuristic 3: single tokens of Katakana or mixed used as names
-    katakana_matches = re.findall(r'([ァ-ン]{2,20})', t)
+    katakana_matches = RE_KATAKANA.findall(t)
     for km in katakana_matches:
         kmn = normalize_candidate(km)
         candidates.append((kmn, 'person', 0.5))
 
-    # dedupe while preserving order
-    seen = set()
-    out = []
+    # dedupe while preserving order (first occurrence of each (lowercased candidate, kind) wins)
+    out = {}
     for c, k, s in candidates:
-        key = (c.lower(), k)
-        if key in seen:
-            continue
-        seen.add(key)
-        out.append((c, k, s))
-
-    return out
+        out.setdefault((c.lower(), k), (c, k, s))
+    return list(out.values())
 
 
 def process(in_csv: str, out_csv: str):
@@ -16,7 +16,6 @@ import argparse
 import csv
 import os
 import re
-from collections import Counter, defaultdict
 from datetime import datetime
 
 import pandas as pd
@@ -25,6 +24,7 @@ import pandas as pd
 RE_QUOTE = re.compile(r'【([^】]{1,80})】|「([^」]{1,80})」|"([^"]{1,80})"')
 # Japanese character runs (kanji, hiragana, katakana) or ascii words
 RE_TOKEN = re.compile(r'[一-龥]+|[ぁ-ん]+|[ァ-ヴー]+|[A-Za-z0-9]+')
+RE_WS = re.compile(r'\s+')
 
 
 def extract_phrases_from_title(title):
@@ -41,8 +41,7 @@ def extract_phrases_from_title(title):
                     phrases.append(s)
 
     # token runs
-    for m in RE_TOKEN.finditer(title):
-        tok = m.group(0)
+    for tok in RE_TOKEN.findall(title):
         # filter length
         if 2 <= len(tok) <= 12:
             phrases.append(tok)
@@ -50,6 +49,36 @@ def extract_phrases_from_title(title):
     return phrases
 
 
+def extract_phrase_table(titles):
+    """Vectorized extract_phrases_from_title over all titles.
+
+    Returns a DataFrame (title, phrase) with one row per distinct normalized phrase
+    per title, in the same order the per-title loop would produce them.
+    """
+    # object dtype keeps the str accessor on Python's re (pyarrow strings would switch to RE2)
+    s = pd.Series(titles, dtype=object)
+
+    # quoted phrases: one column per alternative, keep the non-empty group of each match
+    quotes = s.str.extractall(RE_QUOTE).stack().dropna().str.strip()
+    quotes = quotes[quotes.str.len() >= 2]
+    quotes.index = quotes.index.get_level_values(0)
+
+    # token runs
+    toks = s.str.findall(RE_TOKEN).explode().dropna()
+    toks = toks[toks.str.len().between(2, 12)]
+
+    # stable sort by title keeps quotes before tokens within each title
+    phrases = pd.concat([quotes, toks]).astype(object)
+    doc = pd.Series(phrases.index, dtype='int64').sort_values(kind='stable')
+    phrases = phrases.iloc[doc.index]
+    # normalize whitespace once per distinct phrase
+    norm = {p: RE_WS.sub(' ', p).strip() for p in pd.unique(phrases)}
+    table = pd.DataFrame({'doc': doc.to_numpy(), 'phrase': phrases.map(norm).to_numpy()})
+    table = table.drop_duplicates(['doc', 'phrase'])
+    table['title'] = s.to_numpy()[table['doc'].to_numpy()]
+    return table[['title', 'phrase']]
+
+
 def derive_output_path(input_path, out_arg=None):
     # try to find YYYYMMDD in input filename
     base = os.path.basename(input_path)
@@ -70,27 +99,16 @@ def main():
     df = pd.read_csv(args.in_csv)
     titles = df['title'].fillna('').astype(str).tolist()
 
-    counter = Counter()
-    examples = defaultdict(list)
-
-    for t in titles:
-        phrases = extract_phrases_from_title(t)
-        seen = set()
-        for p in phrases:
-            # normalize whitespace
-            p_norm = re.sub(r'\s+', ' ', p).strip()
-            if p_norm in seen:
-                continue
-            seen.add(p_norm)
-            counter[p_norm] += 1
-            if len(examples[p_norm]) < 3:
-                examples[p_norm].append(t)
-
-    total = sum(counter.values())
+    table = extract_phrase_table(titles)
+    phrases = table['phrase']
+    # value_counts(sort=False) keeps first-seen order; a stable sort then matches Counter.most_common()
+    counts = phrases.value_counts(sort=False).sort_values(ascending=False, kind='stable')
+    examples = table.groupby('phrase', sort=False).head(3).groupby('phrase', sort=False)['title'].agg(' || '.join)
+
     rows = []
-    for phrase, cnt in counter.most_common():
+    for phrase, cnt in counts.items():
         score = cnt / len(titles)  # fraction of titles containing it
-        rows.append({'phrase': phrase, 'count': cnt, 'score': round(score, 4), 'examples': ' || '.join(examples[phrase])})
+        rows.append({'phrase': phrase, 'count': int(cnt), 'score': round(score, 4), 'examples': examples[phrase]})
 
     out_path = derive_output_path(args.in_csv, args.out_csv)
     os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
@@ -3,11 +3,11 @@
 
 Prints summary statistics and examples to stdout.
 """
-from collections import Counter, defaultdict
 import pandas as pd
 import re
 
 IN = 'data/yutura_name_candidates_1-5.csv'
+CJK_RE = re.compile(r'[一-龥ぁ-んァ-ンA-Za-z0-9]')
 
 
 def short(x, n=80):
@@ -18,32 +18,28 @@ def main():
     df = pd.read_csv(IN)
     total_rows = len(df)
     unique_titles = df['title'].nunique()
-    unique_candidates = df[df['candidate'].notna() & (df['candidate']!='')]['candidate'].nunique()
+    mask = df['candidate'].notna() & (df['candidate']!='')
+    sub = df.loc[mask]
+    unique_candidates = sub['candidate'].nunique()
 
-    # candidates per title
-    cp = df.groupby('title').apply(lambda g: g[g['candidate'].notna() & (g['candidate']!='')].shape[0])
+    # candidates per title (titles without any candidate count as 0)
+    cp = sub.groupby('title').size().reindex(df['title'].dropna().unique(), fill_value=0)
     avg_cp = cp.mean()
     median_cp = cp.median()
 
     kind_counts = df['kind'].value_counts()
 
-    # top candidates by frequency
-    cand_counter = Counter()
-    cand_scores = defaultdict(list)
-    for _, r in df.iterrows():
-        c = r['candidate'] if pd.notna(r['candidate']) else ''
-        if c:
-            cand_counter[c] += 1
-            try:
-                cand_scores[c].append(float(r.get('score', 0)))
-            except Exception:
-                pass
-
-    top10 = cand_counter.most_common(20)
+    # top candidates by frequency (stable sort keeps first-seen order among ties, like Counter.most_common)
+    cand_counts = sub['candidate'].value_counts(sort=False).sort_values(ascending=False, kind='stable')
+    cand_avg = pd.to_numeric(sub['score'], errors='coerce').groupby(sub['candidate'], sort=False).mean()
+    top10 = list(cand_counts.head(20).items())
 
     # high-confidence examples
-    high_conf = df[(df['score']>=0.9) & (df['candidate'].notna()) & (df['candidate']!='')]
-    low_conf = df[(df['score']<=0.4) & (df['candidate'].notna()) & (df['candidate']!='')]
+    high_conf = sub[sub['score']>=0.9]
+    low_conf = sub[sub['score']<=0.4]
+    # noisy examples worth showing: longer than one char and containing a word character
+    low_text = low_conf['candidate'].astype(str)
+    low_conf = low_conf[(low_text.str.len() > 1) & low_text.str.contains(CJK_RE)]
 
     print(f"Input: {IN}")
     print(f"Total rows: {total_rows}")
@@ -56,22 +52,16 @@ def main():
 
     print('\nTop candidates (by frequency, up to 20):')
     for c, cnt in top10:
-        avg_score = sum(cand_scores[c]) / len(cand_scores[c]) if cand_scores[c] else 0
+        avg_score = cand_avg.get(c, 0)
         print(f"  {cnt:3d}x  {short(c,60):60}  avg_score={avg_score:.2f}")
 
     print('\nHigh-confidence examples (score>=0.9), up to 10:')
-    for _, r in high_conf.head(10).iterrows():
-        print(f"  [{r['score']}] {short(r['candidate'],60):60}  -- title: {short(r['title'],80)}")
+    for r in high_conf.head(10).itertuples(index=False):
+        print(f"  [{r.score}] {short(r.candidate,60):60}  -- title: {short(r.title,80)}")
 
     print('\nLow-confidence/noisy examples (score<=0.4), up to 15:')
-    show=0
-    for _, r in low_conf.iterrows():
-        c=r['candidate']
-        if len(str(c))>1 and re.search(r'[一-龥ぁ-んァ-ンA-Za-z0-9]', str(c)):
-            print(f"  [{r['score']}] {short(c,60):60}  -- title: {short(r['title'],80)}")
-            show+=1
-            if show>=15:
-                break
+    for r in low_conf.head(15).itertuples(index=False):
+        print(f"  [{r.score}] {short(r.candidate,60):60}  -- title: {short(r.title,80)}")
 
 
 if __name__ == '__main__':
@@ -6,61 +6,127 @@ Saves to data/yutura_news_page5_from_html.csv
 from bs4 import BeautifulSoup
 import os
 import re
-import pandas as pd
+
+from scrape_yutura import write_rows_csv
+
+try:
+    import lxml.html  # C parser: XPath fast path below, and BeautifulSoup's tree builder
+    HTML_PARSER = "lxml"
+except ImportError:
+    lxml = None
+    HTML_PARSER = "html.parser"
 
 IN = 'data/yutura_page5_selenium.html'
 OUT = 'data/yutura_news_page5_from_html.csv'
+HEADING_KEYS = ['人気のニュース', 'YouTuberニュース', '人気ニュース']
+
+
+def _has_class(name):
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+
+def _text(el, sep):
+    # same as BeautifulSoup get_text(sep, strip=True)
+    return sep.join(t for t in (s.strip() for s in el.itertext()) if t)
+
+
+def _abs_href(href):
+    if href and href.startswith('/'):
+        href = 'https://yutura.net' + href
+    return href
+
+
+def parse_rows_lxml(html):
+    """parse_rows_bs4 on lxml with XPath: the tree walks stay in C."""
+    root = lxml.html.document_fromstring(html.encode('utf-8'), parser=lxml.html.HTMLParser(encoding='utf-8'))
+    heading = next((h for h in root.xpath('//h2|//h3') if any(k in _text(h, ' ') for k in HEADING_KEYS)), None)
+
+    container = None
+    if heading is not None:
+        container = heading.getparent()
+        while container is not None and container.tag != 'body' and not {'news-latest', 'news'} & set((container.get('class') or '').split()):
+            container = container.getparent()
+    if container is None:
+        found = (root.xpath(f'//*[{_has_class("news-latest")}]') or root.xpath(f'//section[{_has_class("news")}]')
+                 or root.xpath('//*[@id="main"]'))
+        container = found[0] if found else root
+
+    uls = container.xpath('.//ul[contains(@class, "news-list")]') or root.xpath(f'//*[{_has_class("news-list")}]')
+    rows = []
+    for ul in uls:
+        for li in ul.iter('li'):
+            title_node = li.xpath(f'.//*[{_has_class("title")}]')
+            a = (title_node[0] if title_node else li).xpath('.//a')
+            if not a:
+                continue
+            a = a[0]
+            title = _text(a, ' ')
+            if not title:
+                title = a.get('aria-label') or a.get('title') or ''
+            href = _abs_href(a.get('href') or '')
+            date_tag = li.xpath(f'.//p[{_has_class("date")}]')
+            date_text = _text(date_tag[0], '') if date_tag else ''
+            rows.append({'rank': len(rows) + 1, 'title': title, 'url': href, 'date': date_text})
+    return rows
+
+
+def parse_rows_bs4(html):
+    soup = BeautifulSoup(html, HTML_PARSER)
+
+    # find the h2/h3 heading that contains "人気のニュース"
+    rows = []
+    heading = None
+    for h in soup.find_all(['h2', 'h3']):
+        txt = h.get_text(" ", strip=True)
+        if any(k in txt for k in HEADING_KEYS):
+            heading = h
+            break
+
+    # Determine container: prefer heading-based container, else fall back to known containers
+    container = None
+    if heading:
+        container = heading.find_parent()
+        while container and (container.name != 'body') and ('news-latest' not in (container.get('class') or []) and 'news' not in (container.get('class') or [])):
+            container = container.find_parent()
+
+    if not container:
+        container = soup.select_one('.news-latest') or soup.select_one('section.news') or soup.select_one('#main') or soup
+
+    # collect all ul elements with class containing 'news-list' inside the container
+    uls = container.find_all('ul', class_=re.compile(r'news-list')) if container else soup.select('.news-list')
+    if not uls:
+        uls = soup.select('.news-list')
+    idx = 1
+    for ul in uls:
+        lis = ul.find_all('li')
+        for li in lis:
+            title_node = li.find(class_='title')
+            a = title_node.find('a') if title_node else li.find('a')
+            if not a:
+                continue
+            title = a.get_text(' ', strip=True)
+            if not title:
+                title = a.get('aria-label') or a.get('title') or ''
+            href = _abs_href(a.get('href') or '')
+            date_tag = li.find('p', class_='date')
+            date_text = date_tag.get_text(strip=True) if date_tag else ''
+            rows.append({'rank': idx, 'title': title, 'url': href, 'date': date_text})
+            idx += 1
+    return rows
+
+
+def parse_rows(html):
+    return parse_rows_lxml(html) if lxml is not None else parse_rows_bs4(html)
+
+
+if __name__ == '__main__':
+    with open(IN, 'r', encoding='utf-8') as f:
+        html = f.read()
 
-with open(IN, 'r', encoding='utf-8') as f:
-    html = f.read()
-
-soup = BeautifulSoup(html, 'html.parser')
-
-# find the h2/h3 heading that contains "人気のニュース"
-rows = []
-heading = None
-for h in soup.find_all(['h2', 'h3']):
-    txt = h.get_text(" ", strip=True)
-    if any(k in txt for k in ['人気のニュース', 'YouTuberニュース', '人気ニュース']):
-        heading = h
-        break
-
-# Determine container: prefer heading-based container, else fall back to known containers
-container = None
-if heading:
-    container = heading.find_parent()
-    while container and (container.name != 'body') and ('news-latest' not in (container.get('class') or []) and 'news' not in (container.get('class') or [])):
-        container = container.find_parent()
-
-if not container:
-    container = soup.select_one('.news-latest') or soup.select_one('section.news') or soup.select_one('#main') or soup
-
-# collect all ul elements with class containing 'news-list' inside the container
-uls = container.find_all('ul', class_=re.compile(r'news-list')) if container else soup.select('.news-list')
-if not uls:
-    uls = soup.select('.news-list')
-idx = 1
-for ul in uls:
-    lis = ul.find_all('li')
-    for li in lis:
-        title_node = li.find(class_='title')
-        a = title_node.find('a') if title_node else li.find('a')
-        if not a:
-            continue
-        title = a.get_text(' ', strip=True)
-        if not title:
-            title = a.get('aria-label') or a.get('title') or ''
-        href = a.get('href') or ''
-        if href and href.startswith('/'):
-            href = 'https://yutura.net' + href
-        date_tag = li.find('p', class_='date')
-        date_text = date_tag.get_text(strip=True) if date_tag else ''
-        rows.append({'rank': idx, 'title': title, 'url': href, 'date': date_text})
-        idx += 1
-
-if rows:
-    os.makedirs('data', exist_ok=True)
-    pd.DataFrame(rows).to_csv(OUT, index=False, encoding='utf-8-sig')
-    print(f'saved {OUT} rows={len(rows)}')
-else:
-    print('no rows found')
+    rows = parse_rows(html)
+    if rows:
+        os.makedirs('data', exist_ok=True)
+        write_rows_csv(rows, OUT)
+        print(f'saved {OUT} rows={len(rows)}')
+    else:
+        print('no rows found')
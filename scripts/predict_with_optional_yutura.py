@@ -4,6 +4,7 @@ Predict view counts for a trend CSV, with optional Yutura feature merging.
 
 Usage:
   python scripts\predict_with_optional_yutura.py --trend trend_data\trending_JP_category24_no_shorts_20251009.csv --out data\preds.csv [--use-yutura data\features_yutura_20251009.csv]
+  python scripts\predict_with_optional_yutura.py --export-treelite   # one-off: compile xgb_model.pkl -> xgb_model.so
 
 If --use-yutura is provided, the script will left-join yutura features on videoId
 before predicting. Output CSV contains original trend rows plus prediction and
@@ -11,20 +12,100 @@ the yutura features if merged.
 """
 import argparse
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import joblib
 import pandas as pd
 import numpy as np
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
-def load_model_and_vectorizer(model_path='xgb_model.pkl', vec_path='vectorizer.pkl'):
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa_csv = None
+
+try:
+    # optional: XGBoost trees compiled to a native library (see --export-treelite)
+    import tl2cgen
+except ImportError:
+    tl2cgen = None
+
+
+def read_csv_fast(path):
+    """pd.read_csv(path) through pyarrow's multithreaded CSV reader when pyarrow is installed.
+
+    Date/time columns are kept as text (as pandas does) so they are written back unchanged;
+    falls back to pandas if the file does not fit the types inferred from its first block.
+    """
+    if pa_csv is None:
+        return pd.read_csv(path)
     try:
-        model = joblib.load(model_path)
+        with pa_csv.open_csv(path) as reader:
+            schema = reader.schema
+        text_cols = {f.name: pa.string() for f in schema
+                     if pa.types.is_timestamp(f.type) or pa.types.is_date(f.type) or pa.types.is_time(f.type)}
+        opts = pa_csv.ConvertOptions(column_types=text_cols, strings_can_be_null=True)
+        return pa_csv.read_csv(path, convert_options=opts).to_pandas()
+    except pa.ArrowInvalid:
+        return pd.read_csv(path)
+
+
+def default_treelite_lib(model_path):
+    return os.path.splitext(model_path)[0] + '.so'
+
+
+def export_treelite_lib(model_path, libpath, toolchain='gcc'):
+    """Offline step: compile the XGBoost model at model_path into a native prediction library."""
+    import treelite
+    booster = joblib.load(model_path)
+    booster = getattr(booster, 'get_booster', lambda: booster)()
+    tl_model = treelite.frontend.from_xgboost(booster)
+    tl2cgen.export_lib(tl_model, toolchain=toolchain, libpath=libpath, params={'parallel_comp': os.cpu_count() or 1})
+    print(f'Wrote compiled model to {libpath}')
+
+
+class CompiledModel:
+    """predict(X) shim over a tl2cgen-compiled model library."""
+
+    def __init__(self, libpath):
+        self.predictor = tl2cgen.Predictor(libpath)
+
+    def predict(self, X):
+        return self.predictor.predict(tl2cgen.DMatrix(X)).reshape(len(X))
+
+
+def load_compiled_model(model_path, libpath=None):
+    """CompiledModel for model_path if a compiled library at least as new as the pickle exists, else None."""
+    libpath = libpath or default_treelite_lib(model_path)
+    if tl2cgen is None or not os.path.exists(libpath):
+        return None
+    if os.path.exists(model_path) and os.path.getmtime(libpath) < os.path.getmtime(model_path):
+        print(f'Warning: {libpath} is older than {model_path}; ignoring it (re-run --export-treelite)')
+        return None
+    try:
+        return CompiledModel(libpath)
     except Exception as e:
-        print(f'Warning: failed to load model from {model_path}: {e}')
-        model = None
+        print(f'Warning: failed to load compiled model from {libpath}: {e}')
+        return None
+
+
+def load_model_and_vectorizer(model_path='xgb_model.pkl', vec_path='vectorizer.pkl', lib_path=None):
+    # uncompressed joblib pickles (the joblib.dump default used by the training scripts) have their
+    # numpy arrays (e.g. the vectorizer's idf_) memory-mapped read-only instead of copied into RAM
+    model = load_compiled_model(model_path, lib_path)
+    if model is None:
+        try:
+            model = joblib.load(model_path, mmap_mode='r')
+        except Exception as e:
+            print(f'Warning: failed to load model from {model_path}: {e}')
+            model = None
     try:
-        vec = joblib.load(vec_path)
+        vec = joblib.load(vec_path, mmap_mode='r')
     except Exception as e:
         print(f'Warning: failed to load vectorizer from {vec_path}: {e}')
         vec = None
@@ -47,76 +128,233 @@ def load_model_and_vectorizer(model_path='xgb_model.pkl', vec_path='vectorizer.p
     return model, vec
 
 
-def extract_thumbnail_brightness(url, fallback=100.0):
+def extract_thumbnail_brightness(url, fallback=100.0, session=None):
     # lightweight: avoid network in bulk runs; try to read if valid, else fallback
     try:
         from PIL import Image
         import requests
         from io import BytesIO
-        resp = requests.get(url, timeout=3)
+        resp = (session or requests).get(url, timeout=3)
         img = Image.open(BytesIO(resp.content)).convert('L').resize((64,64))
         return float(np.mean(np.array(img)))
     except Exception:
         return float(fallback)
 
 
-def prepare_feature_row(row, vectorizer):
-    title = str(row.get('title','') if pd.notna(row.get('title','')) else '')
-    desc = str(row.get('description','') if pd.notna(row.get('description','')) else '')
-    cat = int(row.get('categoryId') if pd.notna(row.get('categoryId')) else -1)
-    thumb = row.get('thumbnail','')
-    # TF-IDF part
-    tv = vectorizer.transform([title])
-    try:
-        # sparse matrix -> toarray
-        tfidf = tv.toarray().flatten()
-    except Exception:
-        import numpy as _np
-        arr = _np.asarray(tv)
-        if arr.ndim == 2:
-            tfidf = arr.flatten()
-        else:
-            tfidf = arr
+def fetch_thumbnail_brightness(thumbs, fallback=100.0, max_workers=32):
+    """Brightness per row, fetching each distinct thumbnail URL once on a thread pool.
 
-    brightness = extract_thumbnail_brightness(thumb)
-    title_len = len(title)
-    desc_len = len(desc)
-    has_shorts = 1 if 'shorts' in title.lower() else 0
+    Thumbnail fetches are network-bound, so threads overlap the round trips; one
+    pooled requests.Session keeps connections alive across URLs.
+    """
+    thumbs = pd.Series(thumbs)
+    urls = thumbs.dropna().unique().tolist()
+    results = {}
+    if urls:
+        try:
+            import requests
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        except ImportError:
+            session = None
+        with ThreadPoolExecutor(max_workers=max_workers) as ex:
+            results = dict(zip(urls, ex.map(lambda u: extract_thumbnail_brightness(u, fallback, session), urls)))
+        if session is not None:
+            session.close()
+    return thumbs.map(results).fillna(float(fallback)).to_numpy(dtype=float)
 
-    # extra features used during training: trend_score and interest_score
-    trend_keywords = ["shorts", "tiktok", "破産", "共感性羞恥", "炎上"]
-    trend_score = sum(1 for kw in trend_keywords if kw in (title + ' ' + desc))
 
-    # load comment keywords file if available
-    interest_score = 0
+def predict_log(model, X):
+    """model.predict(X), going straight to Booster.inplace_predict for XGBoost sklearn models.
+
+    inplace_predict reads the numpy array directly instead of building a DMatrix first.
+    """
+    get_booster = getattr(model, 'get_booster', None)
+    if get_booster is None:
+        return model.predict(X)
     try:
-        with open('comment_keywords.txt', encoding='utf-8') as f:
-            interest_keywords = [line.strip() for line in f if line.strip()]
-        interest_score = sum(1 for kw in interest_keywords if kw in (title + ' ' + desc))
-    except Exception:
-        interest_score = 0
+        iteration_range = (0, model.best_iteration + 1)
+    except AttributeError:
+        iteration_range = (0, 0)
+    return get_booster().inplace_predict(X, iteration_range=iteration_range, missing=getattr(model, 'missing', np.nan))
+
+
+PREDICT_BLOCK_ROWS = 4096
+
+
+TREND_KEYWORDS = ["shorts", "tiktok", "破産", "共感性羞恥", "炎上"]
+
+
+def _text_column(df, col):
+    if col not in df.columns:
+        return pd.Series([''] * len(df), index=df.index, dtype=object)
+    return df[col].fillna('').astype(str)
+
+
+def build_keyword_counter(keywords):
+    """Return texts -> number of keywords contained in each text (duplicates in `keywords` count twice).
+
+    With pyahocorasick every text is scanned once for all keywords; otherwise one
+    vectorized substring search runs per keyword.
+    """
+    weights = {}
+    for kw in keywords:
+        weights[kw] = weights.get(kw, 0) + 1
+    if ahocorasick is None or not weights:
+        def count(texts):
+            hits = np.zeros(len(texts), dtype=int)
+            for kw, w in weights.items():
+                hits += w * texts.str.contains(kw, regex=False).to_numpy(dtype=int)
+            return hits
+        return count
+    automaton = ahocorasick.Automaton()
+    for kw, w in weights.items():
+        automaton.add_word(kw, (kw, w))
+    automaton.make_automaton()
+    def count(texts):
+        texts = texts.to_numpy(dtype=object)
+        return np.fromiter((sum(w for _, w in {v for _, v in automaton.iter(t)}) for t in texts),
+                           dtype=int, count=len(texts))
+    return count
+
+
+_INTEREST_COUNTERS = {}
+
+def get_interest_counter(path='comment_keywords.txt'):
+    """Read the comment keyword file once and keep its compiled counter (None if unreadable)."""
+    if path not in _INTEREST_COUNTERS:
+        try:
+            with open(path, encoding='utf-8') as f:
+                interest_keywords = [line.strip() for line in f if line.strip()]
+            _INTEREST_COUNTERS[path] = build_keyword_counter(interest_keywords)
+        except Exception:
+            _INTEREST_COUNTERS[path] = None
+    return _INTEREST_COUNTERS[path]
+
+
+TREND_COUNTER = build_keyword_counter(TREND_KEYWORDS)
+
+
+def text_features(titles, descs, vectorizer):
+    """CPU-bound text part of the features for a slice of rows.
+
+    Returns (float32 [title_length, description_length, has_shorts, trend_score, interest_score],
+    TF-IDF as CSR, or a dense array for the dummy vectorizer).
+    """
+    title_len = titles.str.len().to_numpy()
+    desc_len = descs.str.len().to_numpy()
+    has_shorts = titles.str.lower().str.contains('shorts', regex=False).to_numpy(dtype=int)
+
+    # extra features used during training: trend_score and interest_score.
+    # title + ' ' + desc is built once and shared by both keyword counters; matching stays
+    # case-sensitive as in training.
+    text = titles + ' ' + descs
+    trend_score = TREND_COUNTER(text)
+
+    # comment keywords file is read once per process if available
+    count_interest = get_interest_counter()
+    interest_score = count_interest(text) if count_interest is not None else np.zeros(len(titles), dtype=int)
+
+    # TF-IDF part: each distinct title is transformed once, then rows are gathered back by code
+    codes, uniq_titles = pd.factorize(titles)
+    tv = vectorizer.transform(list(uniq_titles))
+    tv = tv.tocsr() if hasattr(tv, 'tocsr') else np.asarray(tv).reshape(len(uniq_titles), -1)
+    if len(uniq_titles) < len(titles):
+        tv = tv[codes]
+    feats = np.column_stack([title_len, desc_len, has_shorts, trend_score, interest_score]).astype(np.float32)
+    return feats, tv
+
+
+def build_feature_matrix(df, vectorizer, workers=1):
+    """Features for all rows at once: (dense float32 numeric columns, TF-IDF kept as sparse CSR).
+
+    With workers != 1 the text features are built on contiguous row slices in parallel
+    worker processes (joblib/loky, -1 = all cores) and stacked back in order.
+    """
+    titles = _text_column(df, 'title')
+    descs = _text_column(df, 'description')
+    if 'categoryId' in df.columns:
+        cat = df['categoryId'].fillna(-1).astype(float).astype(int).to_numpy()
+    else:
+        cat = np.full(len(df), -1)
+    thumbs = df['thumbnail'] if 'thumbnail' in df.columns else [''] * len(df)
+    brightness = fetch_thumbnail_brightness(thumbs)
+
+    n_jobs = (os.cpu_count() or 1) if workers < 0 else max(1, workers)
+    if n_jobs > 1 and len(df) > n_jobs:
+        from joblib import Parallel, delayed
+        slices = [idx for idx in np.array_split(np.arange(len(df)), n_jobs) if len(idx)]
+        parts = Parallel(n_jobs=n_jobs, backend='loky')(
+            delayed(text_features)(titles.iloc[idx], descs.iloc[idx], vectorizer) for idx in slices)
+        text_feats = np.concatenate([f for f, _ in parts])
+        if hasattr(parts[0][1], 'tocsr'):
+            from scipy import sparse
+            tv = sparse.vstack([t for _, t in parts], format='csr')
+        else:
+            tv = np.concatenate([t for _, t in parts])
+    else:
+        text_feats, tv = text_features(titles, descs, vectorizer)
 
     # order must match training: [categoryId, thumbnail_brightness, title_length, description_length, has_shorts, trend_score, interest_score, tfidf...]
-    num_feats = np.array([cat, brightness, title_len, desc_len, has_shorts, trend_score, interest_score], dtype=float)
-    feat = np.concatenate([num_feats, np.asarray(tfidf, dtype=float)])
-    return feat
+    num_feats = np.column_stack([cat, brightness, text_feats]).astype(np.float32)
+    return num_feats, tv
+
+
+def dense_block(num_feats, tfidf, start, stop):
+    """Dense float32 rows [start, stop) of the full feature matrix (TF-IDF nonzeros scattered in place)."""
+    n_num = num_feats.shape[1]
+    X = np.zeros((stop - start, n_num + tfidf.shape[1]), dtype=np.float32)
+    X[:, :n_num] = num_feats[start:stop]
+    if hasattr(tfidf, 'tocoo'):
+        coo = tfidf[start:stop].tocoo()
+        X[coo.row, coo.col + n_num] = coo.data
+    else:
+        X[:, n_num:] = tfidf[start:stop]
+    return X
+
+
+def predict_in_blocks(model, num_feats, tfidf, block_rows=PREDICT_BLOCK_ROWS):
+    """Predict block by block so only `block_rows` rows are ever densified at once.
+
+    The models are trained on dense features where TF-IDF zeros are real values; XGBoost
+    would treat entries absent from a CSR matrix as missing, so blocks are densified
+    right before prediction instead of passing the sparse matrix through.
+    """
+    n = num_feats.shape[0]
+    out = [predict_log(model, dense_block(num_feats, tfidf, i, min(i + block_rows, n)))
+           for i in range(0, n, block_rows)]
+    return np.concatenate(out) if out else np.zeros(0)
 
 
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument('--trend', required=True)
-    parser.add_argument('--out', required=True)
+    parser.add_argument('--trend')
+    parser.add_argument('--out')
     parser.add_argument('--use-yutura', default=None, help='path to yutura features CSV to left-join on videoId')
     parser.add_argument('--model', default='xgb_model.pkl')
     parser.add_argument('--vectorizer', default='vectorizer.pkl')
+    parser.add_argument('--treelite-lib', default=None,
+                        help='compiled model library (default: <model>.so); used when present and tl2cgen is installed')
+    parser.add_argument('--export-treelite', action='store_true',
+                        help='compile --model into --treelite-lib with treelite/tl2cgen and exit')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='processes for the text feature build (-1 = all cores)')
     args = parser.parse_args()
 
-    df = pd.read_csv(args.trend)
+    if args.export_treelite:
+        export_treelite_lib(args.model, args.treelite_lib or default_treelite_lib(args.model))
+        return
+    if not args.trend or not args.out:
+        parser.error('--trend and --out are required')
+
+    df = read_csv_fast(args.trend)
 
     # optionally merge yutura features
     if args.use_yutura:
         if os.path.exists(args.use_yutura):
-            df_yu = pd.read_csv(args.use_yutura)
+            df_yu = read_csv_fast(args.use_yutura)
             # ensure videoId column exists
             if 'videoId' not in df_yu.columns:
                 print('yutura features missing videoId column; skipping merge')
@@ -128,16 +366,11 @@ def main():
         else:
             print('Provided yutura features file not found, continuing without them')
 
-    model, vec = load_model_and_vectorizer(args.model, args.vectorizer)
+    model, vec = load_model_and_vectorizer(args.model, args.vectorizer, args.treelite_lib)
 
-    # build feature matrix row-by-row (this is simple and may be slow for large CSVs)
-    feats = []
-    for _, r in df.iterrows():
-        feat = prepare_feature_row(r, vec)
-        feats.append(feat)
-    X = np.vstack(feats)
+    num_feats, tfidf = build_feature_matrix(df, vec, workers=args.workers)
 
-    log_preds = model.predict(X)
+    log_preds = predict_in_blocks(model, num_feats, tfidf)
     preds = np.expm1(log_preds).astype(int)
     df['pred_view_count'] = preds
 
@@ -3,6 +3,7 @@
 Scrape yutura.net news page (example: /news/page/5) and extract titles and guessed names.
 Saves CSV to data/yutura_news_page5.csv
 """
+import codecs
 import time
 import re
 import random
@@ -12,6 +13,30 @@ import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 
+try:
+    import lxml  # noqa: F401  (C parser for BeautifulSoup; html.parser if missing)
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+try:
+    import brotli  # noqa: F401  (lets requests/httpx decode "br" responses)
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+try:
+    import httpx
+    import h2  # noqa: F401  (httpx needs it for http2=True)
+except ImportError:
+    httpx = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = pa_csv = None
+
 BASE = "https://yutura.net"
 HEADERS = {
     # Use a realistic modern Chrome UA to reduce chance of simple bot blocking
@@ -19,9 +44,47 @@ HEADERS = {
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
     "Accept-Language": "ja-JP,ja;q=0.9,en-US;q=0.8,en;q=0.7",
     "Referer": "https://yutura.net/",
+    "Accept-Encoding": ACCEPT_ENCODING,
 }
-SESSION = requests.Session()
-SESSION.headers.update(HEADERS)
+
+
+def make_session(pool_size=8):
+    """Shared keep-alive HTTP client: httpx over HTTP/2 when available, else a pooled requests.Session.
+
+    Both expose .get(url, timeout=...) returning a response with .status_code / .text.
+    """
+    if httpx is not None:
+        return httpx.Client(http2=True, headers=HEADERS, timeout=15, follow_redirects=True,
+                            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size))
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+SESSION = make_session()
+
+
+def write_rows_csv(rows: List[dict], out_path: str) -> None:
+    """Write a list of row dicts as a UTF-8 (with BOM) CSV.
+
+    Uses pyarrow's C++ CSV writer when available, otherwise pandas. List values
+    (e.g. names_guess) are written as their Python repr, as pandas does.
+    """
+    if pa_csv is not None:
+        records = [{k: str(v) if isinstance(v, list) else v for k, v in r.items()} for r in rows]
+        try:
+            table = pa.Table.from_pylist(records)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            table = None
+        if table is not None:
+            with open(out_path, "wb") as f:
+                f.write(codecs.BOM_UTF8)
+                pa_csv.write_csv(table, f)
+            return
+    pd.DataFrame(rows).to_csv(out_path, index=False, encoding="utf-8-sig")
 
 
 def get(url, sleep=(0.8, 1.6), timeout=15):
@@ -48,29 +111,29 @@ def get(url, sleep=(0.8, 1.6), timeout=15):
 
 
 JA_PUNCT = "！!？?（）()「」『』【】・、。［］[]"
+PUNCT_RE = re.compile(rf"[{JA_PUNCT}]")
+WS_RE = re.compile(r"\s+")
+NAME_RE = re.compile(r"[ァ-ヴーA-Za-z0-9][ァ-ヴーA-Za-z0-9・\-]{1,}")
+DATE_HINT_RE = re.compile(r"\d{4}\.\d{2}\.\d{2}|20\d{2}年\d{1,2}月\d{1,2}日")
 
 def normalize_txt(s: str) -> str:
     s = s or ""
-    s = re.sub(rf"[{JA_PUNCT}]", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
+    s = PUNCT_RE.sub(" ", s)
+    s = WS_RE.sub(" ", s).strip()
     return s
 
 
 def guess_names_from_title(title: str) -> List[str]:
     t = normalize_txt(title)
-    cands = re.findall(r"[ァ-ヴーA-Za-z0-9][ァ-ヴーA-Za-z0-9・\-]{1,}", t)
-    uniq = []
-    for w in cands:
-        if w not in uniq:
-            uniq.append(w)
-    return uniq[:8]
+    # dict.fromkeys: order-preserving dedupe
+    return list(dict.fromkeys(NAME_RE.findall(t)))[:8]
 
 
 def scrape_news_page(page: int = 5) -> pd.DataFrame:
     url = f"{BASE}/news/page/{page}"
     print(f"GET {url}")
     res = get(url)
-    soup = BeautifulSoup(res.text, "html.parser")
+    soup = BeautifulSoup(res.text, HTML_PARSER)
 
     rows = []
     # Find article list items - try common selectors
@@ -89,7 +152,7 @@ def scrape_news_page(page: int = 5) -> pd.DataFrame:
             href = BASE + href
         # try to find date inside item
         date_text = ""
-        date_tag = it.find(string=re.compile(r"\d{4}\.\d{2}\.\d{2}|20\d{2}年\d{1,2}月\d{1,2}日"))
+        date_tag = it.find(string=DATE_HINT_RE)
         if date_tag:
             date_text = str(date_tag)
         rank += 1
@@ -112,7 +175,7 @@ if __name__ == '__main__':
             import os
             os.makedirs(out_dir, exist_ok=True)
             out_path = os.path.join(out_dir, "yutura_news_page5.csv")
-            df.to_csv(out_path, index=False, encoding="utf-8-sig")
+            write_rows_csv(df.to_dict("records"), out_path)
             print(f"saved: {out_path} rows={len(df)}")
         else:
             print("no items found on page")
@@ -7,27 +7,97 @@ Usage example:
 
 This script will visit each page, wait for rendering, extract all news items (handles ad-split lists),
 and save a combined CSV with columns: rank,page,title,url,date,source_page.
+Pages are first fetched with plain HTTP; Selenium is only started for pages where that yields no items.
 """
 import argparse
 import logging
 import os
 import random
 import time
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin
 
 from bs4 import BeautifulSoup
-import pandas as pd
+
+try:
+    import lxml.html  # C parser: XPath fast path below, and BeautifulSoup's tree builder
+    HTML_PARSER = "lxml"
+except ImportError:
+    lxml = None
+    HTML_PARSER = "html.parser"
 
 from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
 from webdriver_manager.chrome import ChromeDriverManager
 
+from scrape_yutura import SESSION, write_rows_csv
+
 
 BASE_URL = "https://yutura.net/news/page/{page}"
+NEWS_ITEM_SELECTOR = 'ul[class*="news-list"] li'
+
+
+def _has_class(name):
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+
+XP_HEADER = '(//h2|//h3)[contains(string(.), "人気のニュース")][1]'
+XP_NEWS_LATEST = f'(//section[{_has_class("news-latest")}] | //div[{_has_class("news-latest")}])'
+XP_NEWS_UL = './/ul[contains(@class, "news-list")]'
+XP_TITLE_LINK = f'.//h3[{_has_class("title")}]//a'
+XP_DATE = f'(.//time)[1] | (.//span[{_has_class("date")}])[1] | (.//small)[1]'
+
+
+def _text(el):
+    # same as BeautifulSoup get_text(strip=True)
+    return "".join(t.strip() for t in el.itertext())
+
+
+def _parse_page_lxml(html, base_url):
+    """parse_page_html on lxml with XPath: the tree walks stay in C."""
+    if not html or not html.strip():
+        return []
+    # bytes + explicit encoding: str input with an XML encoding declaration is rejected by lxml
+    root = lxml.html.document_fromstring(html.encode("utf-8"), parser=lxml.html.HTMLParser(encoding="utf-8"))
+    container = None
+    header = root.xpath(XP_HEADER)
+    if header:
+        # The news lists are commonly the next sibling section/div
+        nxt = header[0].xpath("following-sibling::*[1]")
+        container = nxt[0] if nxt else None
+    if container is None:
+        # Fallbacks: first section.news-latest, else first div.news-latest
+        latest = root.xpath(XP_NEWS_LATEST)
+        sections = [el for el in latest if el.tag == "section"]
+        container = (sections or latest or [root])[0]
+
+    uls = container.xpath(XP_NEWS_UL) or root.xpath(XP_NEWS_UL)
+    items = []
+    for ul in uls:
+        for li in ul.iter("li"):
+            a = li.xpath(XP_TITLE_LINK) or li.xpath(".//a[@href]")
+            if not a:
+                continue
+            a = a[0]
+            title = a.get("aria-label") or _text(a)
+            href = a.get("href")
+            url = urljoin(base_url, href) if href else ""
+            dates = li.xpath(XP_DATE)
+            # keep the time > span.date > small preference
+            date_tag = next((d for tag in ("time", "span", "small") for d in dates if d.tag == tag), None)
+            date_text = _text(date_tag) if date_tag is not None else ""
+            items.append({"title": title, "url": url, "date": date_text})
+    return items
 
 
 def parse_page_html(html, base_url="https://yutura.net"):
-    soup = BeautifulSoup(html, "html.parser")
+    if lxml is not None:
+        return _parse_page_lxml(html, base_url)
+    soup = BeautifulSoup(html, HTML_PARSER)
 
     # Try to find the specific "人気のニュース" heading first
     header = soup.find(lambda tag: tag.name in ["h2", "h3"] and "人気のニュース" in tag.get_text())
@@ -78,6 +148,21 @@ def parse_page_html(html, base_url="https://yutura.net"):
     return items
 
 
+_DRIVER_PATH = None
+
+
+def chromedriver_path():
+    """chromedriver location, resolved once per process.
+
+    $CHROMEDRIVER pins it (no network access, e.g. in CI); otherwise webdriver-manager's
+    version check / download runs only for the first driver created.
+    """
+    global _DRIVER_PATH
+    if _DRIVER_PATH is None:
+        _DRIVER_PATH = os.environ.get("CHROMEDRIVER") or ChromeDriverManager().install()
+    return _DRIVER_PATH
+
+
 def create_driver(headless=True):
     options = webdriver.ChromeOptions()
     if headless:
@@ -92,37 +177,87 @@ def create_driver(headless=True):
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument("--window-size=1200,800")
     options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36")
+    # Return once the DOM is ready (don't wait for subresources) and skip image downloads
+    options.page_load_strategy = "eager"
+    options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
 
-    service = Service(ChromeDriverManager().install())
+    service = Service(chromedriver_path())
     driver = webdriver.Chrome(service=service, options=options)
     return driver
 
 
-def scrape_pages(start_page, end_page, out_path, headless=True, save_html_dir=None, delay_range=(1.0, 2.5)):
+def fetch_static_html(url, timeout=15):
+    """Plain HTTP fetch of a page (the news list is server-rendered); None on any failure."""
+    try:
+        res = SESSION.get(url, timeout=timeout)
+    except Exception as e:
+        logging.info(f"Static fetch failed for {url}: {e}")
+        return None
+    if res.status_code != 200:
+        logging.info(f"Static fetch returned status={res.status_code} for {url}")
+        return None
+    return res.text
+
+
+def prefetch_static_pages(pages, concurrency=3, delay_range=(1.0, 2.5)):
+    """Fetch pages over plain HTTP with up to `concurrency` requests in flight -> {page: html or None}.
+
+    Each worker still waits a random polite delay before its request.
+    """
+    def fetch(page):
+        time.sleep(random.uniform(*delay_range))
+        url = BASE_URL.format(page=page)
+        logging.info(f"Fetching page {page}: {url}")
+        return fetch_static_html(url)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as ex:
+        return dict(zip(pages, ex.map(fetch, pages)))
+
+
+def render_html(driver, url, wait_timeout=5.0):
+    driver.get(url)
+    # Wait until news items are present instead of a fixed sleep
+    try:
+        WebDriverWait(driver, wait_timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, NEWS_ITEM_SELECTOR)))
+    except TimeoutException:
+        logging.info(f"No news items rendered within {wait_timeout}s on {url}; parsing what is there")
+    return driver.page_source
+
+
+def scrape_pages(start_page, end_page, out_path, headless=True, save_html_dir=None, delay_range=(1.0, 2.5),
+                 static_first=True, concurrency=3):
     os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
     if save_html_dir:
         os.makedirs(save_html_dir, exist_ok=True)
 
-    driver = create_driver(headless=headless)
+    # Chrome is only started (once, then reused) for pages the static fetch can't parse
+    driver = None
     collected = []
     rank_counter = 1
 
+    pages = list(range(start_page, end_page + 1))
+    static_html = prefetch_static_pages(pages, concurrency, delay_range) if static_first else {}
+
     try:
-        for page in range(start_page, end_page + 1):
+        for page in pages:
             url = BASE_URL.format(page=page)
-            logging.info(f"Fetching page {page}: {url}")
-            driver.get(url)
-            # Wait a bit for JS to render
-            time.sleep(2.0)
+            html = static_html.get(page)
+            items = parse_page_html(html) if html else []
+            if not items:
+                logging.info(f"Rendering page {page} with Selenium: {url}")
+                if driver is None:
+                    driver = create_driver(headless=headless)
+                html = render_html(driver, url)
+                items = parse_page_html(html)
+                # polite delay between rendered pages
+                time.sleep(random.uniform(*delay_range))
 
-            html = driver.page_source
             if save_html_dir:
                 fname = os.path.join(save_html_dir, f"yutura_page_{page}.html")
                 with open(fname, "w", encoding="utf-8") as f:
                     f.write(html)
-                logging.info(f"Saved rendered HTML to {fname}")
+                logging.info(f"Saved HTML to {fname}")
 
-            items = parse_page_html(html)
             logging.info(f"Parsed {len(items)} items on page {page}")
 
             for it in items:
@@ -137,19 +272,16 @@ def scrape_pages(start_page, end_page, out_path, headless=True, save_html_dir=No
                 collected.append(it_record)
                 rank_counter += 1
 
-            # polite delay between pages
-            time.sleep(random.uniform(*delay_range))
-
     finally:
-        try:
-            driver.quit()
-        except Exception:
-            pass
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
 
     if collected:
-        df = pd.DataFrame(collected)
-        df.to_csv(out_path, index=False, encoding="utf-8-sig")
-        logging.info(f"Wrote {len(df)} rows to {out_path}")
+        write_rows_csv(collected, out_path)
+        logging.info(f"Wrote {len(collected)} rows to {out_path}")
     else:
         logging.warning("No items collected; no CSV written")
 
@@ -161,6 +293,8 @@ def main():
     parser.add_argument("--out", type=str, default=None, help="output CSV path; default includes date if not provided")
     parser.add_argument("--headless", action="store_true", help="run browser headless")
     parser.add_argument("--save-html-dir", type=str, default=None, help="directory to save rendered HTML per page")
+    parser.add_argument("--concurrency", type=int, default=3, help="parallel plain-HTTP page fetches")
+    parser.add_argument("--selenium-only", action="store_true", help="always render with Selenium (skip the plain HTTP fetch)")
     parser.add_argument("--date-stamp", action="store_true", help="append YYYYMMDD date stamp to output filenames/dirs when defaults are used")
     args = parser.parse_args()
 
@@ -177,7 +311,8 @@ def main():
     if save_html_dir is None and args.date_stamp:
         save_html_dir = f"data/yutura_pages_html_{today}"
 
-    scrape_pages(args.start, args.end, out, headless=args.headless, save_html_dir=save_html_dir)
+    scrape_pages(args.start, args.end, out, headless=args.headless, save_html_dir=save_html_dir,
+                 static_first=not args.selenium_only, concurrency=args.concurrency)
 
 
 if __name__ == "__main__":
@@ -10,6 +10,8 @@ PowerShell 実行例 (faceenv 等の Python 環境で):
 pip install selenium webdriver-manager beautifulsoup4 pandas
 python scripts\scrape_yutura_selenium.py --page 5
 """
+import atexit
+import hashlib
 import time
 import argparse
 import os
@@ -19,36 +21,55 @@ from datetime import datetime
 from bs4 import BeautifulSoup
 import pandas as pd
 
+try:
+    import lxml  # noqa: F401  (C parser for BeautifulSoup; html.parser if missing)
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+try:
+    from selectolax.lexbor import LexborHTMLParser  # C (Lexbor) parser; BeautifulSoup if missing
+except ImportError:
+    LexborHTMLParser = None
+
 from selenium import webdriver
+from selenium.common.exceptions import InvalidSessionIdException
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+
+from scrape_yutura_pages_selenium import chromedriver_path, fetch_static_html
 
 BASE = "https://yutura.net"
+CHROME_PROFILE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "yutura_chrome_profile")
+CHROME_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "yutura_chrome_disk_cache")
+CHROME_CACHE_BYTES = 100 * 1024 * 1024
+# fetched page HTML is reused for this many seconds (0 = always refetch; see --no-cache)
+HTML_CACHE_DIR = os.path.join('data', 'cache')
+HTML_CACHE_TTL = 3600
 
 JA_PUNCT = "！!？?（）()「」『』【】・、。［］[]"
+PUNCT_RE = re.compile(rf"[{JA_PUNCT}]")
+WS_RE = re.compile(r"\s+")
+NAME_RE = re.compile(r"[ァ-ヴーA-Za-z0-9][ァ-ヴーA-Za-z0-9・\-]{1,}")
+DATE_HINT_RE = re.compile(r"\d{4}\.\d{2}\.\d{2}|20\d{2}年\d{1,2}月\d{1,2}日")
+NEWS_LIST_RE = re.compile(r"news-list")
 
 def normalize_txt(s: str) -> str:
     s = s or ""
-    s = re.sub(rf"[{JA_PUNCT}]", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
+    s = PUNCT_RE.sub(" ", s)
+    s = WS_RE.sub(" ", s).strip()
     return s
 
 
 def guess_names_from_title(title: str) -> List[str]:
     t = normalize_txt(title)
-    cands = re.findall(r"[ァ-ヴーA-Za-z0-9][ァ-ヴーA-Za-z0-9・\-]{1,}", t)
-    uniq = []
-    for w in cands:
-        if w not in uniq:
-            uniq.append(w)
-    return uniq[:8]
+    return list(dict.fromkeys(NAME_RE.findall(t)))[:8]
 
 
-def fetch_page_with_selenium(url: str, headless: bool = True, wait_selector: str = 'body') -> str:
+def chrome_options(headless: bool = True) -> Options:
     chrome_options = Options()
     if headless:
         chrome_options.add_argument("--headless=new")
@@ -56,45 +77,168 @@ def fetch_page_with_selenium(url: str, headless: bool = True, wait_selector: str
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
     chrome_options.add_argument("--window-size=1920,1080")
+    # persistent profile + disk cache so yutura's static JS/CSS is reused across runs
+    # (a profile can only be held by one Chrome at a time, hence one per headless setting)
+    chrome_options.add_argument(f"--user-data-dir={CHROME_PROFILE_DIR}{'' if headless else '_headed'}")
+    chrome_options.add_argument(f"--disk-cache-dir={CHROME_CACHE_DIR}")
+    chrome_options.add_argument(f"--disk-cache-size={CHROME_CACHE_BYTES}")
+    # only text is scraped, so skip image downloads
+    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
     # set a realistic UA
     chrome_options.add_argument(
         'user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
     )
+    return chrome_options
 
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-    try:
-        driver.get(url)
-        # wait until body or an article list appears
+
+class _DriverPool:
+    """One lazily started Chrome per headless setting, shared by every scrape in the process."""
+    _drivers = {}
+
+    @classmethod
+    def get_driver(cls, headless: bool = True):
+        driver = cls._drivers.get(headless)
+        if driver is None:
+            driver = webdriver.Chrome(service=Service(chromedriver_path()), options=chrome_options(headless))
+            cls._drivers[headless] = driver
+        return driver
+
+    @classmethod
+    def recreate(cls, driver):
+        """Quit a driver whose session died and return a fresh one with the same settings."""
+        headless = next((h for h, d in cls._drivers.items() if d is driver), None)
+        if headless is not None:
+            del cls._drivers[headless]
         try:
-            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, wait_selector)))
+            driver.quit()
         except Exception:
-            # still continue
             pass
-        time.sleep(1)
-        html = driver.page_source
-        # save debug HTML
+        return cls.get_driver(True if headless is None else headless)
+
+    @classmethod
+    def close_all(cls):
+        for driver in cls._drivers.values():
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        cls._drivers.clear()
+
+
+atexit.register(_DriverPool.close_all)
+
+
+def _load(driver, url: str):
+    """driver.get(url), restarting the browser once if its session has died -> the driver used."""
+    try:
+        driver.get(url)
+    except InvalidSessionIdException:
+        driver = _DriverPool.recreate(driver)
+        driver.get(url)
+    return driver
+
+
+def _cached_fetch(url: str, kind: str, fetch, ttl: float = None):
+    """HTML for url from data/cache/<kind>_<sha1(url)>.html when younger than ttl seconds,
+    otherwise fetch(url) and store it there. `kind` keeps static and rendered HTML apart."""
+    ttl = HTML_CACHE_TTL if ttl is None else ttl
+    path = os.path.join(HTML_CACHE_DIR, f"{kind}_{hashlib.sha1(url.encode('utf-8')).hexdigest()}.html")
+    if ttl > 0 and os.path.exists(path) and os.path.getmtime(path) > time.time() - ttl:
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+    html = fetch(url)
+    if html:
         try:
-            os.makedirs('data', exist_ok=True)
-            with open(f'data/yutura_page_debug.html', 'w', encoding='utf-8') as f:
+            os.makedirs(HTML_CACHE_DIR, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
                 f.write(html)
-        except Exception:
+        except OSError:
             pass
-        return html
-    finally:
+    return html
+
+
+def fetch_page_with_selenium(url: str, headless: bool = True, wait_selector: str = 'body', driver=None) -> str:
+    def render(url):
+        drv = _load(driver or _DriverPool.get_driver(headless), url)
+        # wait until body or an article list appears
         try:
-            driver.quit()
+            WebDriverWait(drv, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, wait_selector)))
         except Exception:
+            # still continue
             pass
+        time.sleep(1)
+        return drv.page_source
 
+    return _cached_fetch(url, 'rendered', render)
 
-def scrape_news_page_selenium(page: int = 5) -> pd.DataFrame:
-    url = f"{BASE}/news/page/{page}"
-    html = fetch_page_with_selenium(url, headless=True, wait_selector='main')
-    soup = BeautifulSoup(html, 'html.parser')
+
+def _iter_following(node):
+    """Elements after `node` in document order, its own descendants first (bs4's find_next order)."""
+    cur = node
+    while True:
+        if cur.child is not None:
+            cur = cur.child
+        else:
+            while cur is not None and cur.next is None:
+                cur = cur.parent
+            if cur is None:
+                return
+            cur = cur.next
+        if not cur.tag.startswith('-'):  # skip -text / -comment nodes
+            yield cur
+
+
+def _lexbor_text(node, sep: str = '') -> str:
+    """Same as BeautifulSoup get_text(sep, strip=True): text nodes only (no comments), each stripped,
+    empty ones dropped, joined with `sep`."""
+    return sep.join(t for t in (n.text_content.strip() for n in node.traverse(include_text=True)
+                                if n.tag == '-text') if t)
+
+
+def _lexbor_date_hint(node) -> str:
+    """Same as bs4 `find(string=DATE_HINT_RE).get_text(strip=True)`: the first text or comment node
+    matching DATE_HINT_RE; a comment wins the search but its get_text() is empty."""
+    for n in node.traverse(include_text=True):
+        if n.tag == '-text' and DATE_HINT_RE.search(n.text_content or ''):
+            return n.text_content.strip()
+        if n.tag == '-comment' and DATE_HINT_RE.search((n.html or '')[4:-3]):
+            return ''
+    return ''
+
+
+def parse_news_items_lexbor(html: str) -> List[tuple]:
+    """(title, href, date_text) for each news item, parsed with selectolax's Lexbor (C) parser."""
+    tree = LexborHTMLParser(html)
+    heading = next((h for h in tree.css('h2, h3') if '人気のニュース' in _lexbor_text(h, ' ')), None)
+
+    ul = None
+    if heading is not None:
+        ul = next((n for n in _iter_following(heading)
+                   if n.tag == 'ul' and 'news-list' in (n.attributes.get('class') or '')), None)
+    if ul is None:
+        ul = tree.css_first('.news-list.n1') or tree.css_first('.news-list')
+    items = ul.css('li') if ul is not None else tree.css('.news-list li, .news li, article, .post')
+
+    out = []
+    for it in items:
+        p_title = it.css_first('p.title')
+        a = p_title.css_first('a') if p_title is not None else it.css_first('a')
+        if a is None:
+            continue
+        date_tag = it.css_first('p.date')
+        if date_tag is not None:
+            date_text = _lexbor_text(date_tag)
+        else:
+            date_text = _lexbor_date_hint(it)
+        out.append((_lexbor_text(a, ' '), a.attributes.get('href') or '', date_text))
+    return out
+
+
+def parse_news_items_bs4(html: str) -> List[tuple]:
+    """Same as parse_news_items_lexbor with BeautifulSoup (used when selectolax is not installed)."""
+    soup = BeautifulSoup(html, HTML_PARSER)
     # Try to specifically extract the "人気のニュース" section: find H2 that contains that text,
     # then find the following UL with class containing "news-list" (observed: <ul class="news-list n1">)
-    rows = []
     heading = None
     for h in soup.find_all(['h2', 'h3']):
         txt = h.get_text(" ", strip=True)
@@ -104,7 +248,7 @@ def scrape_news_page_selenium(page: int = 5) -> pd.DataFrame:
 
     ul = None
     if heading:
-        ul = heading.find_next('ul', class_=re.compile(r'news-list'))
+        ul = heading.find_next('ul', class_=NEWS_LIST_RE)
 
     if not ul:
         # fallback: try generic selector
@@ -116,20 +260,30 @@ def scrape_news_page_selenium(page: int = 5) -> pd.DataFrame:
     else:
         items = ul.find_all('li')
 
-    rank = 0
+    out = []
     for it in items:
         # in the news-list structure, title is under <p class="title"><a ...>
         p_title = it.find('p', class_='title')
         a = p_title.find('a') if p_title else it.find('a')
         if not a:
             continue
-        title = a.get_text(' ', strip=True)
-        href = a.get('href') or ''
+        date_tag = it.find('p', class_='date') or it.find(string=DATE_HINT_RE)
+        date_text = str(date_tag.get_text(strip=True)) if hasattr(date_tag, 'get_text') else (str(date_tag) if date_tag else '')
+        out.append((a.get_text(' ', strip=True), a.get('href') or '', date_text))
+    return out
+
+
+def parse_news_items(html: str) -> List[tuple]:
+    if LexborHTMLParser is not None:
+        return parse_news_items_lexbor(html)
+    return parse_news_items_bs4(html)
+
+
+def _news_rows(page: int, items: List[tuple]) -> pd.DataFrame:
+    rows = []
+    for rank, (title, href, date_text) in enumerate(items, start=1):
         if href and not href.startswith('http'):
             href = BASE + href
-        date_tag = it.find('p', class_='date') or it.find(string=re.compile(r"\d{4}\.\d{2}\.\d{2}|20\d{2}年\d{1,2}月\d{1,2}日"))
-        date_text = str(date_tag.get_text(strip=True)) if hasattr(date_tag, 'get_text') else (str(date_tag) if date_tag else '')
-        rank += 1
         rows.append({
             'page': page,
             'rank': rank,
@@ -142,82 +296,88 @@ def scrape_news_page_selenium(page: int = 5) -> pd.DataFrame:
     return pd.DataFrame(rows)
 
 
-def scrape_news_page_selenium_elements(page: int = 5, headless: bool = True) -> pd.DataFrame:
+def scrape_news_page_static(page: int = 5) -> pd.DataFrame:
+    """The news list is in the server-rendered HTML: fetch it over plain HTTP (shared keep-alive
+    session, HTTP/2 when httpx is installed) without starting Chrome. Empty if nothing is found."""
+    html = _cached_fetch(f"{BASE}/news/page/{page}", 'static', fetch_static_html)
+    return _news_rows(page, parse_news_items(html) if html else [])
+
+
+def scrape_news_page_selenium(page: int = 5, driver=None, static_first: bool = True) -> pd.DataFrame:
+    if static_first:
+        df = scrape_news_page_static(page)
+        if not df.empty:
+            return df
+    url = f"{BASE}/news/page/{page}"
+    html = fetch_page_with_selenium(url, headless=True, wait_selector='main', driver=driver)
+    return _news_rows(page, parse_news_items(html))
+
+
+def scrape_news_page_selenium_elements(page: int = 5, headless: bool = True, driver=None) -> pd.DataFrame:
     """Use Selenium to find elements directly and read their .text and href attributes.
     This often yields rendered text (better for JS-heavy or complex DOM).
+    The browser comes from the shared pool unless `driver` is given; it is left running for reuse.
     """
     url = f"{BASE}/news/page/{page}"
-    chrome_options = Options()
-    if headless:
-        chrome_options.add_argument("--headless=new")
-        chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--window-size=1920,1080")
-    chrome_options.add_argument(
-        'user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-    )
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
+    driver = _load(driver or _DriverPool.get_driver(headless), url)
     try:
-        driver.get(url)
-        try:
-            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, '.news-list.n1')))
-        except Exception:
-            # fallback wait for main
-            WebDriverWait(driver, 5).until(EC.presence_of_element_located((By.CSS_SELECTOR, 'main')))
-        time.sleep(0.8)
+        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, '.news-list.n1')))
+    except Exception:
+        # fallback wait for main
+        WebDriverWait(driver, 5).until(EC.presence_of_element_located((By.CSS_SELECTOR, 'main')))
+    time.sleep(0.8)
 
-        # Save rendered HTML for debugging
-        try:
-            html = driver.page_source
-            os.makedirs('data', exist_ok=True)
-            with open(f'data/yutura_page{page}_selenium.html', 'w', encoding='utf-8') as f:
-                f.write(html)
-        except Exception:
-            pass
+    # Save rendered HTML for debugging
+    try:
+        html = driver.page_source
+        os.makedirs('data', exist_ok=True)
+        with open(f'data/yutura_page{page}_selenium.html', 'w', encoding='utf-8') as f:
+            f.write(html)
+    except Exception:
+        pass
 
-        # Use h3.title a as observed in the rendered HTML
-        elems = driver.find_elements(By.CSS_SELECTOR, '.news-list.n1 li h3.title a')
-        if not elems:
-            elems = driver.find_elements(By.CSS_SELECTOR, '.news-list li h3.title a')
-        rows = []
-        print(f"DEBUG: found {len(elems)} elements via CSS selector")
-        for i, el in enumerate(elems, start=1):
-            # prefer rendered innerText/textContent if .text is empty
-            text = (el.text or '').strip()
-            if not text:
-                text = (el.get_attribute('innerText') or '').strip()
-            if not text:
-                text = (el.get_attribute('textContent') or '').strip()
-            href = el.get_attribute('href') or el.get_attribute('data-href') or ''
-            if href and href.startswith('/'):
-                href = BASE + href
-            print(f"DEBUG: elem[{i}] title_len={len(text)} href={href}")
-            rows.append({
-                'page': page,
-                'rank': i,
-                'title': text,
-                'url': href,
-                'names_guess': guess_names_from_title(text),
-            })
-        return pd.DataFrame(rows)
-    finally:
-        try:
-            driver.quit()
-        except Exception:
-            pass
+    # Use h3.title a as observed in the rendered HTML
+    elems = driver.find_elements(By.CSS_SELECTOR, '.news-list.n1 li h3.title a')
+    if not elems:
+        elems = driver.find_elements(By.CSS_SELECTOR, '.news-list li h3.title a')
+    rows = []
+    print(f"DEBUG: found {len(elems)} elements via CSS selector")
+    for i, el in enumerate(elems, start=1):
+        # prefer rendered innerText/textContent if .text is empty
+        text = (el.text or '').strip()
+        if not text:
+            text = (el.get_attribute('innerText') or '').strip()
+        if not text:
+            text = (el.get_attribute('textContent') or '').strip()
+        href = el.get_attribute('href') or el.get_attribute('data-href') or ''
+        if href and href.startswith('/'):
+            href = BASE + href
+        print(f"DEBUG: elem[{i}] title_len={len(text)} href={href}")
+        rows.append({
+            'page': page,
+            'rank': i,
+            'title': text,
+            'url': href,
+            'names_guess': guess_names_from_title(text),
+        })
+    return pd.DataFrame(rows)
 
 
 if __name__ == '__main__':
     p = argparse.ArgumentParser()
     p.add_argument('--page', type=int, default=5)
+    p.add_argument('--no-cache', action='store_true', help=f'ignore HTML cached in {HTML_CACHE_DIR}')
     args = p.parse_args()
+    if args.no_cache:
+        HTML_CACHE_TTL = 0
     try:
-        # Prefer element-based extraction (more robust for rendered content)
-        df = scrape_news_page_selenium_elements(args.page)
+        # Static HTML first (no browser); then element-based extraction (more robust for rendered
+        # content); the BS4 fallback gets the same pooled browser instead of starting a second one
+        df = scrape_news_page_static(args.page)
+        if df.empty:
+            df = scrape_news_page_selenium_elements(args.page)
         if df.empty:
-            df = scrape_news_page_selenium(args.page)
+            df = scrape_news_page_selenium(args.page, static_first=False)
         if not df.empty:
             out_dir = 'data'
             os.makedirs(out_dir, exist_ok=True)
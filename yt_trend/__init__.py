@@ -8,7 +8,7 @@ Utility functions for YouTube Trending features.
 Exports:
 - fetch_trending (from .get_trending)
 - build_trend_vocab_from_csvs, save_trend_vocab_json,
-  load_trend_vocab_json, title_trend_features (from .trend_features)
+  load_trend_vocab_json, title_trend_features, TrendScorer (from .trend_features)
 """
 
 from .get_trending import fetch_trending
@@ -17,6 +17,7 @@ from .trend_features import (
     save_trend_vocab_json,
     load_trend_vocab_json,
     title_trend_features,
+    TrendScorer,
 )
 
 __all__ = [
@@ -25,4 +26,5 @@ __all__ = [
     "save_trend_vocab_json",
     "load_trend_vocab_json",
     "title_trend_features",
+    "TrendScorer",
 ]
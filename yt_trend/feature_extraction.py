@@ -1,35 +1,56 @@
 # ✅ feature_extraction.py（完全版：307次元対応）
 import pandas as pd
 import numpy as np
+from scipy.sparse import csr_matrix, hstack, save_npz
 from sklearn.feature_extraction.text import TfidfVectorizer
 from PIL import Image
 import requests
 from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
 import joblib
+import json
+import sys
+from collections import Counter
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 # 📥 データ読み込み
 df = pd.read_excel("youtube_dataset.xlsx")
 
 # 🔤 タイトルTF-IDF（300次元）
 vectorizer = TfidfVectorizer(max_features=300)
-tfidf_matrix = vectorizer.fit_transform(df["title"].fillna(""))
-tfidf_df = pd.DataFrame(tfidf_matrix.toarray(), columns=[f"tfidf_{t}" for t in vectorizer.get_feature_names_out()])
-tfidf_df.index = df.index
+tfidf_matrix = vectorizer.fit_transform(df["title"].fillna(""))  # 疎行列のまま保持する
+tfidf_names = [f"tfidf_{t}" for t in vectorizer.get_feature_names_out()]
 
 # 📊 カテゴリ変換
 df["categoryId"] = pd.to_numeric(df["categoryId"], errors='coerce').fillna(-1).astype(int)
 
-# 🎨 サムネイル明度
+# 🎨 サムネイル明度（通信待ちが支配的なのでスレッドで並列取得し、接続はセッションで使い回す）
 print("🎨 サムネイル明度抽出中...")
+SESSION = requests.Session()
+_adapter = requests.adapters.HTTPAdapter(pool_connections=32, pool_maxsize=32)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
 def extract_thumbnail_brightness(url):
     try:
-        img = Image.open(BytesIO(requests.get(url, timeout=5).content)).convert("L").resize((64, 64))
+        img = Image.open(BytesIO(SESSION.get(url, timeout=5).content))
+        img.draft("L", (64, 64))  # JPEG は縮小デコード（DCT スケーリング）で済ませる
+        img = img.convert("L").resize((64, 64))
         return np.mean(np.array(img))
     except:
         return np.nan
 
-df["thumbnail_brightness"] = [extract_thumbnail_brightness(url) for url in tqdm(df["thumbnail"].fillna(""))]
+# 進捗表示は 1 秒に 1 回まで（端末でなければ出さない）。結果はリストを介さず配列へ直接詰める
+with ThreadPoolExecutor(max_workers=16) as ex:
+    thumbs = df["thumbnail"].fillna("")
+    progress = tqdm(ex.map(extract_thumbnail_brightness, thumbs), total=len(thumbs),
+                    mininterval=1.0, smoothing=0, disable=not sys.stderr.isatty())
+    df["thumbnail_brightness"] = np.fromiter(progress, dtype=float, count=len(thumbs))
 df["thumbnail_brightness"] = df["thumbnail_brightness"].fillna(df["thumbnail_brightness"].mean())
 
 # ✨ 拡張特徴量
@@ -38,24 +59,46 @@ df["description_length"] = df["description"].fillna("").str.len()
 df["has_shorts"] = df["title"].str.contains("shorts", case=False, na=False).astype(int)
 
 # 🧠 トレンド・コメントワードスコア
-df["trend_score"] = df.apply(lambda row: sum(kw in str(row["title"]) + str(row["description"]) for kw in ["shorts", "tiktok", "破産", "共感性羞恥", "炎上"]), axis=1)
+# str(title) + str(description) を一度だけ作り、含まれるキーワードの数を数える
+#（同じキーワードは出現数を重みとして掛ける。空行のキーワードは全行に一致する）
+# pyahocorasick があれば全キーワードを 1 つのオートマトンにまとめて各行を 1 回だけ走査し、
+# 無ければキーワードごとにベクトル化した部分一致で数える
+def keyword_score(text, keywords):
+    weights = Counter(keywords)
+    base = weights.pop("", 0)
+    if ahocorasick is not None and weights:
+        automaton = ahocorasick.Automaton()
+        for kw, w in weights.items():
+            automaton.add_word(kw, (kw, w))
+        automaton.make_automaton()
+        return pd.Series([base + sum(w for _, w in {v for _, v in automaton.iter(t)}) for t in text], index=text.index)
+    score = pd.Series(base, index=text.index)
+    for kw, w in weights.items():
+        score += w * text.str.contains(kw, regex=False).astype(int)
+    return score
+
+score_text = df["title"].astype(object).map(str) + df["description"].astype(object).map(str)
+df["trend_score"] = keyword_score(score_text, ["shorts", "tiktok", "破産", "共感性羞恥", "炎上"])
 with open("comment_keywords.txt", encoding="utf-8") as f:
     interest_keywords = [line.strip() for line in f.readlines()]
-df["interest_score"] = df.apply(lambda row: sum(kw in str(row["title"]) + str(row["description"]) for kw in interest_keywords), axis=1)
+df["interest_score"] = keyword_score(score_text, interest_keywords)
 
-# ✅ 特徴量セット
-feature_df = pd.concat([
-    df[["categoryId", "thumbnail_brightness", "title_length", "description_length", "has_shorts", "trend_score", "interest_score"]],
-    tfidf_df
-], axis=1)
+# ✅ 特徴量セット（数値 7 列 + TF-IDF を float32 の CSR として連結。ほぼ 0 の TF-IDF を密にしない）
+numeric_cols = ["categoryId", "thumbnail_brightness", "title_length", "description_length", "has_shorts", "trend_score", "interest_score"]
+X = hstack([
+    csr_matrix(df[numeric_cols].to_numpy(dtype=np.float32)),
+    tfidf_matrix.astype(np.float32)
+], format="csr")
+feature_names = numeric_cols + tfidf_names
 
 # 🔢 目的変数
 df["log_view"] = np.log1p(df["viewCount"])
-X = feature_df
 y = df["log_view"]
 
-# 💾 保存
-X.to_pickle("X.pkl")
+# 💾 保存（X は X.npz、列名は feature_names.json）
+save_npz("X.npz", X)
+with open("feature_names.json", "w", encoding="utf-8") as f:
+    json.dump(feature_names, f, ensure_ascii=False)
 y.to_pickle("y.pkl")
 joblib.dump(vectorizer, "vectorizer.pkl")
 
@@ -28,9 +28,16 @@ except Exception:
     yt_config = None
 import argparse
 import datetime as dt
+import numpy as np
 import pandas as pd
 from googleapiclient.discovery import build
 
+TRENDING_COLUMNS = ['snapshot_at_utc', 'rank', 'videoId', 'title', 'description', 'channelId', 'channelTitle',
+                    'publishedAt', 'categoryId', 'tags', 'thumbnail', 'viewCount', 'likeCount', 'commentCount',
+                    'duration', 'duration_seconds']
+ISO_SECONDS_RE = re.compile(r"(\d+)S")
+ISO_MINUTES_RE = re.compile(r"(\d+)M")
+
 def fetch_trending(api_key: str, region_code: str="JP", max_results: int=200):
     # Deprecated simple fetcher; use fetch_trending_advanced instead.
     return fetch_trending_advanced(api_key, region_code=region_code, max_results=max_results)
@@ -102,8 +109,8 @@ def iso8601_to_seconds(iso_duration: str) -> int:
     if not iso_duration or not isinstance(iso_duration, str):
         return 0
     # 例: PT1M23S, PT15S, PT2M
-    m_s = re.search(r"(\d+)S", iso_duration)
-    m_m = re.search(r"(\d+)M", iso_duration)
+    m_s = ISO_SECONDS_RE.search(iso_duration)
+    m_m = ISO_MINUTES_RE.search(iso_duration)
     secs = 0
     if m_m:
         secs += int(m_m.group(1)) * 60
@@ -125,12 +132,27 @@ def is_shorts_like(title: str, description: str, duration_seconds: int) -> bool:
     return False
 
 
+def shorts_mask(df: pd.DataFrame) -> pd.Series:
+    """Shorts と推定される行を True にした bool Series（行ごとの apply を使わずに列単位で判定）。
+
+    タイトルに 'short'（大文字小文字無視）を含むか、duration（PT#M#S）が 1〜60 秒の行。
+    """
+    title_low = df['title'].fillna('').astype(str).str.lower()
+    dur = df['duration'].fillna('').astype(str)
+    minutes = pd.to_numeric(dur.str.extract(ISO_MINUTES_RE, expand=False)).fillna(0)
+    seconds = pd.to_numeric(dur.str.extract(ISO_SECONDS_RE, expand=False)).fillna(0)
+    secs = minutes * 60 + seconds
+    return title_low.str.contains('short', regex=False) | (dur.str.startswith('PT') & (secs > 0) & (secs <= 60))
+
+
 def fetch_trending_advanced(api_key: str, region_code: str = "JP", max_results: int = 200, category_id: str = None, exclude_shorts: bool = False):
     """mostPopular をページングで取得し、オプションで Shorts を除外して返す。
-    戻り値は rows のリスト（後で DataFrame に変換）
+    戻り値は DataFrame（列ごとに組み立てて変換）
     """
     youtube = build("youtube", "v3", developerKey=api_key)
-    results = []
+    # 行ごとの dict ではなく列ごとのリストに詰め、最後に型を指定して DataFrame 化する
+    cols = {k: [] for k in TRENDING_COLUMNS}
+    ts = dt.datetime.utcnow().isoformat() + 'Z'
 
     fetched = 0
     page_token = None
@@ -163,31 +185,35 @@ def fetch_trending_advanced(api_key: str, region_code: str = "JP", max_results:
                 # mark as excluded (not appended)
                 continue
 
-            results.append({
-                'snapshot_at_utc': dt.datetime.utcnow().isoformat() + 'Z',
-                'rank': rank_offset,
-                'videoId': vid,
-                'title': title,
-                'description': desc,
-                'channelId': snip.get('channelId'),
-                'channelTitle': snip.get('channelTitle'),
-                'publishedAt': snip.get('publishedAt'),
-                'categoryId': snip.get('categoryId'),
-                'tags': '|'.join(snip.get('tags', [])) if snip.get('tags') else '',
-                'thumbnail': snip.get('thumbnails', {}).get('high', {}).get('url'),
-                'viewCount': int(stats.get('viewCount')) if stats.get('viewCount') is not None else None,
-                'likeCount': int(stats.get('likeCount')) if stats.get('likeCount') is not None else None,
-                'commentCount': int(stats.get('commentCount')) if stats.get('commentCount') is not None else None,
-                'duration': duration_iso,
-                'duration_seconds': duration_sec,
-            })
+            cols['snapshot_at_utc'].append(ts)
+            cols['rank'].append(rank_offset)
+            cols['videoId'].append(vid)
+            cols['title'].append(title)
+            cols['description'].append(desc)
+            cols['channelId'].append(snip.get('channelId'))
+            cols['channelTitle'].append(snip.get('channelTitle'))
+            cols['publishedAt'].append(snip.get('publishedAt'))
+            cols['categoryId'].append(snip.get('categoryId'))
+            cols['tags'].append('|'.join(snip.get('tags', [])) if snip.get('tags') else '')
+            cols['thumbnail'].append(snip.get('thumbnails', {}).get('high', {}).get('url'))
+            cols['viewCount'].append(stats.get('viewCount'))
+            cols['likeCount'].append(stats.get('likeCount'))
+            cols['commentCount'].append(stats.get('commentCount'))
+            cols['duration'].append(duration_iso)
+            cols['duration_seconds'].append(duration_sec)
 
         fetched += len(items)
         page_token = res.get('nextPageToken')
         if not page_token:
             break
 
-    return pd.DataFrame(results)
+    df = pd.DataFrame(cols)
+    # 統計値は欠損があり得るので nullable 整数（欠損で float 化しない）
+    for c in ('viewCount', 'likeCount', 'commentCount'):
+        df[c] = pd.to_numeric(df[c]).astype('Int64')
+    df['rank'] = df['rank'].astype(np.int32)
+    df['duration_seconds'] = df['duration_seconds'].astype(np.int32)
+    return df
 
 def main():
     parser = argparse.ArgumentParser()
@@ -215,29 +241,8 @@ def main():
     if not exclude_shorts and yt_config and getattr(yt_config, 'DEFAULT_EXCLUDE_SHORTS', False):
         exclude_shorts = True
     if exclude_shorts and not df.empty:
-        # Heuristic: title contains 'shorts' (case-insensitive) or duration indicates short (<60s)
-        def is_shorts(row):
-            title = (row.get('title') or '').lower()
-            dur = row.get('duration') or ''
-            if 'shorts' in title or 'short' in title:
-                return True
-            # duration is iso8601 like PT15S or PT1M23S
-            if isinstance(dur, str) and dur.startswith('PT'):
-                # extract seconds roughly
-                import re
-                m_s = re.search(r"(\d+)S", dur)
-                m_m = re.search(r"(\d+)M", dur)
-                secs = 0
-                if m_m:
-                    secs += int(m_m.group(1)) * 60
-                if m_s:
-                    secs += int(m_s.group(1))
-                if secs > 0 and secs <= 60:
-                    return True
-            return False
-
         orig_count = len(df)
-        df = df[~df.apply(is_shorts, axis=1)].reset_index(drop=True)
+        df = df.loc[~shorts_mask(df)].reset_index(drop=True)
         print(f"Excluded shorts: {orig_count - len(df)} videos removed")
     if args.out is None:
         # default out dir from config if available
@@ -1,4 +1,7 @@
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from concurrent.futures import ThreadPoolExecutor
+import threading
 import pandas as pd
 from tqdm import tqdm
 import time
@@ -10,40 +13,56 @@ youtube = build("youtube", "v3", developerKey=API_KEY)
 # ✅ 対象チャンネルID（ステゴロパンチャーズ）
 CHANNEL_ID = "UCusnpkgavQhPV_8e_zEh_jw"
 
-# ✅ 動画ID取得
+# ✅ 動画ID取得（search().list ではなくアップロード再生リストを辿る：クォータ 1/100・再検索なし）
 def get_video_ids(channel_id, max_results=1000):
     video_ids = []
     next_page_token = None
     print("🎬 動画ID取得中...")
+    ch = youtube.channels().list(id=channel_id, part="contentDetails").execute()
+    uploads_pl = ch["items"][0]["contentDetails"]["relatedPlaylists"]["uploads"]
     while len(video_ids) < max_results:
-        req = youtube.search().list(
-            part="id",
-            channelId=channel_id,
+        res = youtube.playlistItems().list(
+            playlistId=uploads_pl,
+            part="contentDetails",
             maxResults=50,
-            type='video',
-            order="date",
             pageToken=next_page_token
-        )
-        res = req.execute()
+        ).execute()
         for item in res["items"]:
-            if item["id"]["kind"] == "youtube#video":
-                video_ids.append(item["id"]["videoId"])
+            video_ids.append(item["contentDetails"]["videoId"])
         next_page_token = res.get("nextPageToken")
         if not next_page_token:
             break
-        time.sleep(0.1)
     return video_ids[:max_results]
 
-# ✅ 動画詳細取得
-def get_video_details(video_ids):
+# ✅ 動画詳細取得（50 件ずつのバッチをスレッドで並行取得）
+#    httplib2 はスレッドセーフではないので、youtube クライアントはスレッドごとに作る
+_local = threading.local()
+
+def _thread_youtube():
+    if not hasattr(_local, "youtube"):
+        _local.youtube = build("youtube", "v3", developerKey=API_KEY)
+    return _local.youtube
+
+def _fetch_batch(batch, retries=5):
+    for attempt in range(retries):
+        try:
+            return _thread_youtube().videos().list(
+                part="snippet,statistics,contentDetails",
+                id=",".join(batch)
+            ).execute()
+        except HttpError as e:
+            # レート制限・一時的なサーバーエラーは指数バックオフで再試行
+            if e.resp.status not in (429, 500, 503) or attempt == retries - 1:
+                raise
+            time.sleep(2 ** attempt)
+
+def get_video_details(video_ids, max_workers=8):
     all_data = []
     print("📦 動画情報取得中...")
-    for i in tqdm(range(0, len(video_ids), 50)):
-        batch = video_ids[i:i+50]
-        res = youtube.videos().list(
-            part="snippet,statistics,contentDetails",
-            id=",".join(batch)
-        ).execute()
+    chunks = [video_ids[i:i+50] for i in range(0, len(video_ids), 50)]
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        results = list(tqdm(ex.map(_fetch_batch, chunks), total=len(chunks)))
+    for res in results:
         for item in res["items"]:
             snippet = item.get("snippet", {})
             stats = item.get("statistics", {})
@@ -61,7 +80,6 @@ def get_video_details(video_ids):
                 "commentCount": int(stats.get("commentCount", 0)) if "commentCount" in stats else None,
                 "duration": content.get("duration")
             })
-        time.sleep(0.1)
     return pd.DataFrame(all_data)
 
 # ✅ 実行
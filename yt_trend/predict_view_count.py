@@ -2,44 +2,80 @@ import numpy as np
 from PIL import Image
 import requests
 from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
 import joblib
+from functools import lru_cache
 import pandas as pd
+from scipy.sparse import csr_matrix, hstack
+
+# 🔧 モデル・ベクトライザ読込（初回の推論時に一度だけ読み込む）
+#    モデルの配列は mmap で読み、OS のページキャッシュをプロセス間で共有する
+@lru_cache(maxsize=1)
+def _get_model():
+    return joblib.load("xgb_model.pkl", mmap_mode="r")  # または rf_model.pkl に差し替え可
+
+
+@lru_cache(maxsize=1)
+def _get_vectorizer():
+    return joblib.load("vectorizer.pkl")
+
+
+def warmup():
+    """モデル・ベクトライザを読み込み、ダミー 1 行で推論しておく（初回呼び出しの初期化コストを前払い）"""
+    model = _get_model()
+    n_features = getattr(model, "n_features_in_", None) or 5 + len(_get_vectorizer().get_feature_names_out())
+    model.predict(np.zeros((1, n_features), dtype=np.float32))
+
 
-# 🔧 モデル・ベクトライザ読込
-model = joblib.load("xgb_model.pkl")  # または rf_model.pkl に差し替え可
-vectorizer = joblib.load("vectorizer.pkl")
 fallback_brightness = 100.0  # 明度欠損時の平均代替値
 
+# 🌐 接続を使い回すセッション（呼び出しごとの TCP/TLS ハンドシェイクを省く）
+SESSION = requests.Session()
+_adapter = requests.adapters.HTTPAdapter(pool_connections=32, pool_maxsize=32)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
 # 🎨 サムネイル明度取得
 def extract_thumbnail_brightness(url):
     try:
-        response = requests.get(url, timeout=5)
-        img = Image.open(BytesIO(response.content)).convert("L").resize((64, 64))
+        response = SESSION.get(url, timeout=5)
+        img = Image.open(BytesIO(response.content))
+        img.draft("L", (64, 64))  # JPEG は縮小デコード（DCT スケーリング）で済ませる
+        img = img.convert("L").resize((64, 64))
         return np.mean(np.array(img))
     except:
         return fallback_brightness
 
-# 🔮 推論関数（拡張特徴量対応）
+# 🔮 推論関数（拡張特徴量対応・まとめて推論）
+PREDICT_BLOCK_ROWS = 4096  # 密行列に展開するのは一度にこの行数まで
+
+def predict_view_counts(titles, descriptions, categoryIds, thumbnail_urls) -> np.ndarray:
+    titles = list(titles)
+    descriptions = list(descriptions)
+    if not titles:
+        return np.zeros(0, dtype=int)
+
+    # TF-IDF（300次元）は全件まとめて変換し、疎行列のまま持つ
+    tfidf = _get_vectorizer().transform(titles).tocsr()
+
+    # その他の特徴量（サムネイル明度は並列取得）
+    with ThreadPoolExecutor(max_workers=16) as ex:
+        brightness = list(ex.map(extract_thumbnail_brightness, thumbnail_urls))
+    title_lens = [len(t) for t in titles]
+    description_lens = [len(d) for d in descriptions]
+    has_shorts = [int("shorts" in t.lower()) for t in titles]
+
+    # 特徴量統合（カテゴリ, 明度, 長さ3種, TF-IDF）。モデルは float32 で評価するので float32 で組む
+    num = np.column_stack([categoryIds, brightness, title_lens, description_lens, has_shorts]).astype(np.float32)
+    X = hstack([csr_matrix(num), tfidf], format="csr", dtype=np.float32)
+
+    # XGBoost は CSR に無い要素を欠損として扱う（学習時は 0 を値として渡している）ため、
+    # ブロックごとに密行列へ戻してから予測する
+    model = _get_model()
+    log_pred = np.concatenate([model.predict(X[i:i + PREDICT_BLOCK_ROWS].toarray())
+                               for i in range(0, X.shape[0], PREDICT_BLOCK_ROWS)])
+    return np.expm1(log_pred).astype(int)  # log1pの逆変換
+
+
 def predict_view_count(title: str, description: str, categoryId: int, thumbnail_url: str) -> int:
-    # TF-IDF（300次元）
-    tfidf_vec = vectorizer.transform([title]).toarray().flatten()
-
-    # その他の特徴量
-    genre = [categoryId]
-    brightness = extract_thumbnail_brightness(thumbnail_url)
-    title_len = len(title)
-    description_len = len(description)
-    has_shorts = int("shorts" in title.lower())
-
-    # 特徴量統合（カテゴリ, 明度, 長さ3種, TF-IDF）
-    feature_vec = np.concatenate([
-        genre,
-        [brightness, title_len, description_len, has_shorts],
-        tfidf_vec
-    ])
-
-    # logスケールで予測 → exp変換
-    log_pred = model.predict([feature_vec])[0]
-    view_pred = int(np.expm1(log_pred))  # log1pの逆変換
-
-    return view_pred
+    return int(predict_view_counts([title], [description], [categoryId], [thumbnail_url])[0])
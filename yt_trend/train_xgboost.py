@@ -4,19 +4,27 @@ from sklearn.metrics import mean_squared_error
 import pandas as pd
 import numpy as np
 import joblib
+import json
+from scipy.sparse import load_npz
 
 # 特徴量と目的変数の読み込み
-X = pd.read_pickle("X.pkl")
+# X.npz は疎行列で保存されているが、XGBoost は CSR に無い要素を欠損として扱うため、
+# 推論時（TF-IDF の 0 を値として渡す）と揃えるよう float32 の密行列に戻してから学習する
+X = load_npz("X.npz").toarray()
 y = pd.read_pickle("y.pkl")
+with open("feature_names.json", encoding="utf-8") as f:
+    feature_names = json.load(f)
 
 # 学習データ分割
 X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-# XGBoost モデル構築
+# XGBoost モデル構築（ヒストグラム法: 特徴量を max_bin 個のビンに量子化して分割を探す）
 model = XGBRegressor(
     n_estimators=300,
     max_depth=6,
     learning_rate=0.1,
+    tree_method="hist",
+    max_bin=256,
     random_state=42,
     n_jobs=-1
 )
@@ -29,7 +37,7 @@ print(f"✅ XGBoost学習完了！RMSE（logスケール）: {rmse:.4f}")
 
 # 特徴重要度上位10
 importances = model.feature_importances_
-top_features = pd.Series(importances, index=X.columns).sort_values(ascending=False).head(10)
+top_features = pd.Series(importances, index=feature_names).sort_values(ascending=False).head(10)
 print("\n📊 重要な特徴量TOP10：")
 print(top_features)
 
@@ -26,18 +26,29 @@ import re
 from collections import Counter
 import numpy as np
 import pandas as pd
+from scipy import sparse
 from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 
 # --- 超軽量な日本語トークナイザ（スペース/記号で分割）---
 # 精密には Janome / Sudachi を推奨。既存プロジェクトで Janome を使っていれば差し替え可能。
 TOKEN_PATTERN = re.compile(r"[^\wぁ-んァ-ン一-龯]+")
 
+class _TokenTable(dict):
+    """str.translate 用の表: TOKEN_PATTERN に当たる文字を空白に、それ以外はそのまま。
+    文字ごとの判定は初回だけ正規表現で行い、以後は dict 引きで済ませる。"""
+    def __missing__(self, code):
+        ch = chr(code)
+        mapped = " " if TOKEN_PATTERN.match(ch) else ch
+        self[code] = mapped
+        return mapped
+
+_TOKEN_TABLE = _TokenTable()
+
 def tokenize(text: str):
-    text = text.lower().strip()
-    text = TOKEN_PATTERN.sub(" ", text)
-    toks = [t for t in text.split() if t]
-    return toks
+    return text.lower().translate(_TOKEN_TABLE).split()
+
+# 極端に短い/一般語を雑に除外（調整可能）
+STOPWORDS = frozenset(["の","に","を","が","で","と","は","も","や","ww","www","w","the","and","for","a","to","in"])
 
 def build_trend_vocab_from_csvs(csv_paths, top_k: int=500):
     """
@@ -52,14 +63,11 @@ def build_trend_vocab_from_csvs(csv_paths, top_k: int=500):
             continue
         df = pd.read_csv(p)
         titles.extend(df["title"].fillna("").tolist())
-    # 単語頻度
+    # 単語頻度（1文字語・STOPWORDS は数える前に落とすので most_common の結果をそのまま使える）
     cnt = Counter()
     for t in titles:
-        cnt.update(tokenize(t))
-    # 極端に短い/一般語を雑に除外（調整可能）
-    stop = set(["の","に","を","が","で","と","は","も","や","ww","www","w","the","and","for","a","to","in"])
-    hotwords = [w for w,_c in cnt.most_common(top_k*2) if (len(w) >= 2 and w not in stop)]
-    hotwords = hotwords[:top_k]
+        cnt.update(w for w in tokenize(t) if len(w) >= 2 and w not in STOPWORDS)
+    hotwords = [w for w, _c in cnt.most_common(top_k)]
     return hotwords, titles
 
 def save_trend_vocab_json(hotwords, json_path="trend_vocab.json"):
@@ -71,29 +79,63 @@ def load_trend_vocab_json(json_path="trend_vocab.json"):
     with open(json_path, "r", encoding="utf-8") as f:
         return json.load(f)["hotwords"]
 
-def title_trend_features(title: str, hotwords, trend_titles_for_bow=None):
-    toks = tokenize(title)
-    if not toks:
-        return {"trend_overlap_count": 0, "trend_overlap_ratio": 0.0, "trend_cosine_sim": 0.0}
-
-    # 1) overlap
-    hw = set(hotwords)
-    overlap = sum(1 for t in toks if t in hw)
-    ratio = overlap / max(1, len(toks))
-
-    # 2) cosine (BoW vs trending corpus)
-    cosine = 0.0
-    if trend_titles_for_bow is not None and len(trend_titles_for_bow) > 0:
-        cv = CountVectorizer(tokenizer=tokenize)
-        bow_corpus = trend_titles_for_bow + [title]
-        X = cv.fit_transform(bow_corpus)
-        sim = cosine_similarity(X[-1], X[:-1]).ravel()
-        cosine = float(np.mean(sim))  # タイトルと急上昇集合の平均類似度
+class TrendScorer:
+    """
+    hotwords と急上昇タイトル集合を一度だけ前処理し、複数タイトルの trend 特徴量をまとめて計算する。
+
+    コサイン類似度の平均は「タイトルの正規化ベクトル」と「急上昇タイトルの正規化ベクトルの平均（重心）」の
+    内積に等しいので、急上昇側は重心ベクトル 1 本に畳んでおく。タイトルのノルムは急上昇側の語彙に無い語も
+    含めて数える（タイトルごとに語彙を作り直していた従来の計算と同じ値になる）。
+    """
 
+    def __init__(self, hotwords, trend_titles_for_bow=None):
+        self.hotwords = np.array(sorted(set(hotwords)), dtype=str)
+        self.cv = None
+        self.centroid = None
+        self.term_weights = {}
+        # 急上昇タイトルから語が 1 つも取れない（空・記号だけ）場合は語彙が作れないので cosine は 0 のまま
+        if trend_titles_for_bow is not None and any(tokenize(t) for t in trend_titles_for_bow):
+            self.cv = CountVectorizer(tokenizer=tokenize, token_pattern=None)
+            Xt = self.cv.fit_transform(trend_titles_for_bow).astype(np.float64)
+            norms = np.sqrt(np.asarray(Xt.multiply(Xt).sum(axis=1)).ravel())
+            norms[norms == 0] = 1.0  # 語の無いタイトルは類似度 0 として平均に含める
+            self.centroid = np.asarray((sparse.diags(1.0 / norms) @ Xt).mean(axis=0)).ravel()
+            # 語 -> 重心の重み の索引。タイトル側は features() で作ったトークン列をそのまま引く
+            self.term_weights = dict(zip(self.cv.get_feature_names_out().tolist(), self.centroid.tolist()))
+
+    def features(self, titles) -> pd.DataFrame:
+        titles = [t if isinstance(t, str) else "" for t in titles]
+        toks = [tokenize(t) for t in titles]
+        # 全タイトルのトークンを 1 本の配列に平らにし、流行語判定を np.isin 一回で済ませて行ごとに集計
+        n_toks = np.array([len(ts) for ts in toks], dtype=int)
+        flat = np.array([t for ts in toks for t in ts], dtype=str)
+        row_ids = np.repeat(np.arange(len(titles)), n_toks)
+        hits = np.isin(flat, self.hotwords) if len(flat) else np.zeros(0, dtype=bool)
+        overlap = np.bincount(row_ids[hits], minlength=len(titles)).astype(int)
+        ratio = overlap / np.maximum(1, n_toks)
+
+        cosine = np.zeros(len(titles))
+        if self.cv is not None and len(titles) > 0:
+            qnorm = np.array([np.sqrt(sum(c * c for c in Counter(ts).values())) for ts in toks])
+            w = self.term_weights
+            dots = np.array([sum(w.get(t, 0.0) for t in ts) for ts in toks])
+            np.divide(dots, qnorm, out=cosine, where=qnorm > 0)
+
+        return pd.DataFrame({
+            "trend_overlap_count": overlap,
+            "trend_overlap_ratio": ratio.astype(float),
+            "trend_cosine_sim": cosine,
+        })
+
+
+def title_trend_features(title: str, hotwords, trend_titles_for_bow=None, scorer=None):
+    """1 タイトル分の特徴量。繰り返し呼ぶ場合は TrendScorer を作って scorer に渡すか、features() でまとめて計算する。"""
+    scorer = scorer or TrendScorer(hotwords, trend_titles_for_bow)
+    row = scorer.features([title]).iloc[0]
     return {
-        "trend_overlap_count": int(overlap),
-        "trend_overlap_ratio": float(ratio),
-        "trend_cosine_sim": float(cosine)
+        "trend_overlap_count": int(row["trend_overlap_count"]),
+        "trend_overlap_ratio": float(row["trend_overlap_ratio"]),
+        "trend_cosine_sim": float(row["trend_cosine_sim"])
     }
 
 def main():
@@ -27,10 +27,10 @@ df["publishedAt"] = pd.to_datetime(df["publishedAt"], errors="coerce")
 # 🕒 投稿タイミング特徴量
 df["weekday"] = df["publishedAt"].dt.weekday
 df["hour"] = df["publishedAt"].dt.hour
-df["is_weekend"] = df["weekday"].apply(lambda x: 1 if x >= 5 else 0)
+df["is_weekend"] = (df["weekday"].to_numpy() >= 5).astype("int8")  # NaT の行は 0
 df["day"] = df["publishedAt"].dt.day
-df["is_month_start"] = df["day"] <= 3
-df["is_month_end"] = df["day"] >= 28
+df["is_month_start"] = (df["day"].to_numpy() <= 3).astype("int8")
+df["is_month_end"] = (df["day"].to_numpy() >= 28).astype("int8")
 df.drop(columns=["day"], inplace=True)
 
 # 🔤 JanomeでTF-IDF（100次元）
@@ -41,15 +41,21 @@ def tokenize_japanese(text):
 
 vectorizer = TfidfVectorizer(tokenizer=tokenize_japanese, token_pattern=None, max_features=100)
 tfidf_matrix = vectorizer.fit_transform(df["title"])
-tfidf_df = pd.DataFrame(tfidf_matrix.toarray(), columns=[f"tfidf_{w}" for w in vectorizer.get_feature_names_out()])
 
 # 🎯 目的変数（logスケール）
 y = np.log1p(df["viewCount"])
 
-# 📊 特徴量定義
-X_base = pd.concat([df[["categoryId"]].reset_index(drop=True), tfidf_df.reset_index(drop=True)], axis=1)
+# 📊 特徴量定義（DataFrame を concat せず、float32 の配列を 1 つ確保して列ブロックごとに書き込む）
+def assemble_features(cols):
+    n_dense = len(cols)
+    X = np.empty((len(df), n_dense + tfidf_matrix.shape[1]), dtype=np.float32)
+    X[:, :n_dense] = df[cols].to_numpy(dtype=np.float32)
+    X[:, n_dense:] = tfidf_matrix.astype(np.float32).toarray()
+    return X
+
+X_base = assemble_features(["categoryId"])
 timing_cols = ["weekday", "hour", "is_weekend", "is_month_start", "is_month_end"]
-X_ext = pd.concat([df[["categoryId"] + timing_cols].reset_index(drop=True), tfidf_df.reset_index(drop=True)], axis=1)
+X_ext = assemble_features(["categoryId"] + timing_cols)
 
 # 🚀 学習・評価関数
 def evaluate_model(X, y):
@@ -2,12 +2,12 @@
 from .pipeline import run_all
 from .thumbnail_features import THUMBNAIL_COLS, extract_all_thumbnail_features_mediapipe
 from .trending_utils import ensure_trending_snapshot_if_missing, add_trend_features
-from .text_features import tokenize_japanese, build_vectorizer
-from .modeling import train_rf, evaluate_rmse, feature_importance_df
+from .text_features import tokenize_japanese, build_vectorizer, build_hashing_vectorizer, fit_text_vectorizer, save_token_cache
+from .modeling import train_rf, train_gbm, train_model, evaluate_rmse, feature_importance_df
 __all__ = [
     "run_all",
     "THUMBNAIL_COLS", "extract_all_thumbnail_features_mediapipe",
     "ensure_trending_snapshot_if_missing", "add_trend_features",
-    "tokenize_japanese", "build_vectorizer",
-    "train_rf", "evaluate_rmse", "feature_importance_df",
+    "tokenize_japanese", "build_vectorizer", "build_hashing_vectorizer", "fit_text_vectorizer", "save_token_cache",
+    "train_rf", "train_gbm", "train_model", "evaluate_rmse", "feature_importance_df",
 ]
@@ -4,11 +4,46 @@ import pandas as pd
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error
 
+try:
+    import lightgbm
+except ImportError:
+    lightgbm = None
+
 def train_rf(X_train, y_train, n_estimators=100, max_depth=10, random_state=42, n_jobs=-1):
     model = RandomForestRegressor(n_estimators=n_estimators, max_depth=max_depth, random_state=random_state, n_jobs=n_jobs)
     model.fit(X_train, y_train)
     return model
 
+def train_gbm(X_train, y_train, X_val=None, y_val=None, n_estimators=1000, num_leaves=63,
+              learning_rate=0.05, early_stopping_rounds=50, random_state=42, n_jobs=-1):
+    """LightGBM で学習（CSR をそのまま受け取る）。検証データがあれば early stopping する。"""
+    if lightgbm is None:
+        raise ImportError("lightgbm is not installed")
+    model = lightgbm.LGBMRegressor(n_estimators=n_estimators, num_leaves=num_leaves, learning_rate=learning_rate,
+                                   random_state=random_state, n_jobs=n_jobs, verbose=-1)
+    if X_val is not None and X_val.shape[0] > 0:
+        model.fit(X_train, y_train, eval_X=X_val, eval_y=y_val,  # eval_set は 4.7 で非推奨
+                  callbacks=[lightgbm.early_stopping(early_stopping_rounds, verbose=False)])
+    else:
+        model.fit(X_train, y_train)
+    return model
+
+def train_model(X_train, y_train, model_type="gbm", val_mask=None, log=print):
+    """model_type="gbm"（LightGBM, 無ければ RF に戻す）または "rf"。
+    val_mask は X_train の行のうち early stopping 用に取り分ける行（bool 配列）。"""
+    if model_type == "gbm" and lightgbm is None:
+        log("lightgbm is not installed; falling back to RandomForest")
+        model_type = "rf"
+    if model_type == "rf":
+        return train_rf(X_train, y_train)
+    if model_type != "gbm":
+        raise ValueError(f"unknown model_type: {model_type!r}")
+    y_train = np.asarray(y_train)
+    if val_mask is None or not val_mask.any() or val_mask.all():
+        return train_gbm(X_train, y_train)
+    fit_idx, val_idx = np.flatnonzero(~val_mask), np.flatnonzero(val_mask)
+    return train_gbm(X_train[fit_idx], y_train[fit_idx], X_train[val_idx], y_train[val_idx])
+
 def evaluate_rmse(model, X_test, y_test):
     log_pred = model.predict(X_test)
     y_pred  = np.expm1(log_pred).astype(int)
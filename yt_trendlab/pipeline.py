@@ -1,16 +1,51 @@
 # -*- coding: utf-8 -*-
 
+import os
 from time import perf_counter
 import pandas as pd
 import numpy as np
+from scipy import sparse
 from isodate import parse_duration
 from .thumbnail_features import ensure_thumbnail_features, THUMBNAIL_COLS
-from .text_features import build_vectorizer
-from .modeling import train_rf, evaluate_rmse, feature_importance_df
+from .text_features import build_text_vectorizer, fit_text_vectorizer, vectorizer_feature_names, save_token_cache
+from .modeling import train_model, evaluate_rmse, feature_importance_df
 
 
+# YouTube の duration（P#DT#H#M#S）を列ごと正規表現で分解する。合わない値だけ isodate に回す
+ISO_DURATION_RE = r"^P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+(?:\.\d+)?)S)?)?$"
 
-def run_all(xlsx_path: str, cutoff="2025-07-01", tfidf_max_features=300, verbose: bool = True, progress_step_pct: int = 5):
+def duration_seconds(durations: pd.Series) -> pd.Series:
+    dur = durations.where(durations.notna(), "P0D").astype(str)
+    parts = dur.str.extract(ISO_DURATION_RE).astype(float)
+    secs = parts.fillna(0).to_numpy() @ np.array([86400.0, 3600.0, 60.0, 1.0])
+    secs = pd.Series(secs, index=durations.index)
+    unmatched = ~dur.str.match(ISO_DURATION_RE)
+    if unmatched.any():
+        secs[unmatched] = dur[unmatched].map(lambda x: parse_duration(x).total_seconds())
+    return secs
+
+# xlsx は読み込みが遅いので、同じ場所に .parquet を作って次回以降はそちらを読む（xlsx の方が新しければ作り直す）
+def load_dataset(xlsx_path: str) -> pd.DataFrame:
+    pq_path = xlsx_path + ".parquet"
+    try:
+        if os.path.getmtime(pq_path) >= os.path.getmtime(xlsx_path):
+            return pd.read_parquet(pq_path)
+    except (OSError, ImportError, ValueError):
+        pass
+    df = pd.read_excel(xlsx_path)
+    try:
+        tmp_path = f"{pq_path}.{os.getpid()}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, pq_path)
+    except Exception as e:  # pyarrow 無し・型が混在した列など
+        print(f"[yt_trendlab] parquet キャッシュを書き込めませんでした {pq_path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return df
+
+
+def run_all(xlsx_path: str, cutoff="2025-07-01", tfidf_max_features=300, verbose: bool = True, progress_step_pct: int = 5,
+            model_type: str = "gbm", val_frac: float = 0.1, text_vectorizer: str = "tfidf"):
     t0 = perf_counter()
     def log(msg):
         if verbose:
@@ -18,41 +53,44 @@ def run_all(xlsx_path: str, cutoff="2025-07-01", tfidf_max_features=300, verbose
 
     # 1) load & basic clean
     log("Loading dataset...")
-    df = pd.read_excel(xlsx_path)
+    df = load_dataset(xlsx_path)
     df["title"] = df["title"].fillna("")
     df["categoryId"] = pd.to_numeric(df["categoryId"], errors="coerce").fillna(-1).astype(int)
     df["viewCount"] = pd.to_numeric(df["viewCount"], errors="coerce").fillna(0)
     df["publishedAt"] = pd.to_datetime(df["publishedAt"], utc=True)
-    df["duration_seconds"] = df["duration"].apply(lambda x: parse_duration(x).total_seconds() if pd.notnull(x) else 0)
-    df = df[df["duration_seconds"] > 60].copy()
-    log(f"Loaded rows: {len(df)} (after Shorts filter)")
+    df["duration_seconds"] = duration_seconds(df["duration"])
+    # rows without publishedAt fall on neither side of the cutoff and were never trained/evaluated;
+    # drop them here so the int8 time features below never see NaT
+    df = df[(df["duration_seconds"] > 60) & df["publishedAt"].notna()].copy()
+    log(f"Loaded rows: {len(df)} (after Shorts / missing publishedAt filter)")
     # 2) thumbnail
     log("Ensuring thumbnail features...")
     df = ensure_thumbnail_features(df, verbose=verbose, step_pct=progress_step_pct)
 
     # 3) time
     log("Building time features...")
-    df["weekday"] = df["publishedAt"].dt.weekday
-    df["hour"] = df["publishedAt"].dt.hour
-    df["is_weekend"] = df["weekday"].isin([5,6]).astype(int)
-    df["is_month_start"] = df["publishedAt"].dt.is_month_start.astype(int)
-    df["is_month_end"] = df["publishedAt"].dt.is_month_end.astype(int)
+    published = df["publishedAt"].dt
+    df["weekday"] = published.weekday.astype("int8")
+    df["hour"] = published.hour.astype("int8")
+    df["is_weekend"] = (df["weekday"].to_numpy() >= 5).astype("int8")
+    df["is_month_start"] = published.is_month_start.to_numpy().astype("int8")
+    df["is_month_end"] = published.is_month_end.to_numpy().astype("int8")
 
     # 4) trending features: removed for single-script parity (we don't add external trend features here)
     log("Skipping external trend feature enrichment (using local features only)")
 
     # 5) TF-IDF
     log("Vectorizing titles (TF-IDF)...")
-    vectorizer = build_vectorizer(max_features=tfidf_max_features)
+    vectorizer = build_text_vectorizer(text_vectorizer, max_features=tfidf_max_features)
     cutoff_ts = pd.to_datetime(cutoff, utc=True)
     df_train = df[df["publishedAt"] < cutoff_ts].copy()
     df_test  = df[df["publishedAt"] >= cutoff_ts].copy()
 
-    tfidf_train = vectorizer.fit_transform(df_train["title"])
+    vectorizer = fit_text_vectorizer(vectorizer, df_train["title"])
+    tfidf_train = vectorizer.transform(df_train["title"])
     tfidf_test  = vectorizer.transform(df_test["title"])
-    tfidf_cols  = [f"tfidf_{w}" for w in vectorizer.get_feature_names_out()]
-    tfidf_df_tr = pd.DataFrame(tfidf_train.toarray(), columns=tfidf_cols, index=df_train.index)
-    tfidf_df_te = pd.DataFrame(tfidf_test.toarray(),  columns=tfidf_cols, index=df_test.index)
+    save_token_cache()
+    tfidf_cols  = vectorizer_feature_names(vectorizer)
 
     # 6) assemble features
     log("Assembling feature matrices...")
@@ -63,17 +101,24 @@ def run_all(xlsx_path: str, cutoff="2025-07-01", tfidf_max_features=300, verbose
     df_test  = df[df["publishedAt"] >= cutoff_ts].copy()
 
     base_cols = ["categoryId","weekday","hour","is_weekend","is_month_start","is_month_end","days_since_posted"]
-    X_train = pd.concat([df_train[base_cols].reset_index(drop=True), df_train[[c for c in THUMBNAIL_COLS]].reset_index(drop=True), tfidf_df_tr.reset_index(drop=True)], axis=1)
-    X_test  = pd.concat([df_test[base_cols].reset_index(drop=True),  df_test[[c for c in THUMBNAIL_COLS]].reset_index(drop=True),  tfidf_df_te.reset_index(drop=True)], axis=1)
+    # keep TF-IDF sparse: stack the dense columns as CSR next to it instead of densifying.
+    # sklearn's RF rejects NaN in sparse input, so missing thumbnail values from the xlsx become 0
+    # (the same value extraction writes for a thumbnail it could not process)
+    dense_cols = base_cols + list(THUMBNAIL_COLS)
+    feature_cols = dense_cols + tfidf_cols
+    X_train = sparse.hstack([sparse.csr_matrix(df_train[dense_cols].fillna(0).to_numpy(dtype=np.float32)), tfidf_train], format="csr", dtype=np.float32)
+    X_test  = sparse.hstack([sparse.csr_matrix(df_test[dense_cols].fillna(0).to_numpy(dtype=np.float32)),  tfidf_test],  format="csr", dtype=np.float32)
 
     y_train = np.log1p(df_train["viewCount"])
     y_test  = df_test["viewCount"]
 
     # 7) train & eval
-    log("Training RandomForest & evaluating...")
-    model = train_rf(X_train, y_train)
+    log(f"Training {model_type} & evaluating...")
+    # early stopping 用に学習期間の末尾 val_frac を検証に回す（時系列順の分割）
+    val_mask = (df_train["publishedAt"] >= df_train["publishedAt"].quantile(1 - val_frac)).to_numpy() if val_frac else None
+    model = train_model(X_train, y_train, model_type=model_type, val_mask=val_mask, log=log)
     rmse_log, rmse_raw, y_pred = evaluate_rmse(model, X_test, y_test)
-    imp_top = feature_importance_df(model, X_train.columns, top=30)
+    imp_top = feature_importance_df(model, feature_cols, top=30)
     log(f"Done. RMSE(log)={rmse_log:.4f}, RMSE(raw)={rmse_raw:.1f}")
 
     # 8) result table
@@ -16,10 +16,11 @@ Returns same contract as original pipeline.run_all: model, df_result, metrics, i
 from time import perf_counter
 import pandas as pd
 import numpy as np
-from isodate import parse_duration
+from scipy import sparse
 from .thumbnail_features import ensure_thumbnail_features, THUMBNAIL_COLS
-from .text_features import build_vectorizer
-from .modeling import train_rf, evaluate_rmse, feature_importance_df
+from .text_features import build_text_vectorizer, fit_text_vectorizer, vectorizer_feature_names, save_token_cache
+from .modeling import train_model, evaluate_rmse, feature_importance_df
+from .pipeline import duration_seconds, load_dataset
 
 
 def run_all_with_yutura(xlsx_path: str,
@@ -28,7 +29,10 @@ def run_all_with_yutura(xlsx_path: str,
                         tfidf_max_features=300,
                         verbose: bool = True,
                         progress_step_pct: int = 5,
-                        yutura_cols=None):
+                        yutura_cols=None,
+                        model_type: str = "gbm",
+                        val_frac: float = 0.1,
+                        text_vectorizer: str = "tfidf"):
     """Train/evaluate model including Yutura features.
 
     Args:
@@ -38,6 +42,10 @@ def run_all_with_yutura(xlsx_path: str,
       tfidf_max_features: TF-IDF max features
       yutura_cols: list of column names from yutura CSV to include; if None,
                    a sensible default list will be used when present.
+      model_type: "gbm" (LightGBM, falls back to RF if not installed) or "rf"
+      val_frac: latest fraction of the training period held out for GBM early stopping
+      text_vectorizer: "tfidf" (vocabulary of tfidf_max_features words) or "hashing"
+                       (vocabulary-free HashingVectorizer + TfidfTransformer)
 
     Returns: model, df_result, metrics, imp_top
     """
@@ -47,14 +55,16 @@ def run_all_with_yutura(xlsx_path: str,
             print(f"[yt_trendlab.yutura] {msg}")
 
     log("Loading dataset...")
-    df = pd.read_excel(xlsx_path)
+    df = load_dataset(xlsx_path)
     df["title"] = df["title"].fillna("")
     df["categoryId"] = pd.to_numeric(df["categoryId"], errors="coerce").fillna(-1).astype(int)
     df["viewCount"] = pd.to_numeric(df["viewCount"], errors="coerce").fillna(0)
     df["publishedAt"] = pd.to_datetime(df["publishedAt"], utc=True)
-    df["duration_seconds"] = df["duration"].apply(lambda x: parse_duration(x).total_seconds() if pd.notnull(x) else 0)
-    df = df[df["duration_seconds"] > 60].copy()
-    log(f"Loaded rows: {len(df)} (after Shorts filter)")
+    df["duration_seconds"] = duration_seconds(df["duration"])
+    # rows without publishedAt fall on neither side of the cutoff and were never trained/evaluated;
+    # drop them here so the int8 time features below never see NaT
+    df = df[(df["duration_seconds"] > 60) & df["publishedAt"].notna()].copy()
+    log(f"Loaded rows: {len(df)} (after Shorts / missing publishedAt filter)")
 
     # thumbnail features
     log("Ensuring thumbnail features...")
@@ -62,11 +72,12 @@ def run_all_with_yutura(xlsx_path: str,
 
     # time features
     log("Building time features...")
-    df["weekday"] = df["publishedAt"].dt.weekday
-    df["hour"] = df["publishedAt"].dt.hour
-    df["is_weekend"] = df["weekday"].isin([5,6]).astype(int)
-    df["is_month_start"] = df["publishedAt"].dt.is_month_start.astype(int)
-    df["is_month_end"] = df["publishedAt"].dt.is_month_end.astype(int)
+    published = df["publishedAt"].dt
+    df["weekday"] = published.weekday.astype("int8")
+    df["hour"] = published.hour.astype("int8")
+    df["is_weekend"] = (df["weekday"].to_numpy() >= 5).astype("int8")
+    df["is_month_start"] = published.is_month_start.to_numpy().astype("int8")
+    df["is_month_end"] = published.is_month_end.to_numpy().astype("int8")
 
     # Merge Yutura features (replaces trend features)
     log("Merging Yutura features...")
@@ -77,7 +88,8 @@ def run_all_with_yutura(xlsx_path: str,
         log("Warning: yutura CSV does not contain 'videoId' column; attempting to merge on title instead")
         df = df.merge(ydf, how='left', left_on='title', right_on='title')
     else:
-        df = df.merge(ydf, how='left', on='videoId')
+        # index join on the yutura side; same rows/columns/suffixes as merge(how='left', on='videoId')
+        df = df.join(ydf.set_index('videoId'), on='videoId', lsuffix='_x', rsuffix='_y').reset_index(drop=True)
 
     # choose default yutura columns if not provided
     if yutura_cols is None:
@@ -99,38 +111,45 @@ def run_all_with_yutura(xlsx_path: str,
 
     # TF-IDF
     log("Vectorizing titles (TF-IDF)...")
-    vectorizer = build_vectorizer(max_features=tfidf_max_features)
+    vectorizer = build_text_vectorizer(text_vectorizer, max_features=tfidf_max_features)
     cutoff_ts = pd.to_datetime(cutoff, utc=True)
     df_train = df[df["publishedAt"] < cutoff_ts].copy()
     df_test  = df[df["publishedAt"] >= cutoff_ts].copy()
 
-    tfidf_train = vectorizer.fit_transform(df_train["title"])
+    vectorizer = fit_text_vectorizer(vectorizer, df_train["title"])
+    tfidf_train = vectorizer.transform(df_train["title"])
     tfidf_test  = vectorizer.transform(df_test["title"])
-    tfidf_cols  = [f"tfidf_{w}" for w in vectorizer.get_feature_names_out()]
-    tfidf_df_tr = pd.DataFrame(tfidf_train.toarray(), columns=tfidf_cols, index=df_train.index)
-    tfidf_df_te = pd.DataFrame(tfidf_test.toarray(),  columns=tfidf_cols, index=df_test.index)
+    save_token_cache()
+    tfidf_cols  = vectorizer_feature_names(vectorizer)
 
     # assemble features: base + thumbnail + tfidf + yutura
     log("Assembling feature matrices (including Yutura)...")
     base_cols = ["categoryId","weekday","hour","is_weekend","is_month_start","is_month_end"]
-    X_train = pd.concat([df_train[base_cols], df_train[[c for c in THUMBNAIL_COLS]], tfidf_df_tr], axis=1)
-    X_test  = pd.concat([df_test[base_cols],  df_test[[c for c in THUMBNAIL_COLS]],  tfidf_df_te], axis=1)
+    # TF-IDF stays sparse; dense columns are converted to CSR and stacked around it.
+    # sklearn's RF rejects NaN in sparse input, so missing thumbnail values from the xlsx become 0
+    # (the same value extraction writes for a thumbnail it could not process)
+    dense_cols = base_cols + list(THUMBNAIL_COLS)
+    feature_cols = dense_cols + tfidf_cols + ycols
 
-    if ycols:
-        X_train = pd.concat([X_train, df_train[ycols]], axis=1).reset_index(drop=True)
-        X_test  = pd.concat([X_test,  df_test[ycols]],  axis=1).reset_index(drop=True)
-    else:
-        X_train = X_train.reset_index(drop=True)
-        X_test  = X_test.reset_index(drop=True)
+    def _stack(part, tfidf):
+        blocks = [sparse.csr_matrix(part[dense_cols].fillna(0).to_numpy(dtype=np.float32)), tfidf]
+        if ycols:
+            blocks.append(sparse.csr_matrix(part[ycols].to_numpy(dtype=np.float32)))
+        return sparse.hstack(blocks, format="csr", dtype=np.float32)
+
+    X_train = _stack(df_train, tfidf_train)
+    X_test  = _stack(df_test, tfidf_test)
 
     y_train = np.log1p(df_train["viewCount"])
     y_test  = df_test["viewCount"]
 
     # train & eval
-    log("Training RandomForest & evaluating...")
-    model = train_rf(X_train, y_train)
+    log(f"Training {model_type} & evaluating...")
+    # hold out the latest val_frac of the training period for early stopping (time-ordered split)
+    val_mask = (df_train["publishedAt"] >= df_train["publishedAt"].quantile(1 - val_frac)).to_numpy() if val_frac else None
+    model = train_model(X_train, y_train, model_type=model_type, val_mask=val_mask, log=log)
     rmse_log, rmse_raw, y_pred = evaluate_rmse(model, X_test, y_test)
-    imp_top = feature_importance_df(model, X_train.columns, top=30)
+    imp_top = feature_importance_df(model, feature_cols, top=30)
     log(f"Done. RMSE(log)={rmse_log:.4f}, RMSE(raw)={rmse_raw:.1f}")
 
     # result table
@@ -1,12 +1,105 @@
 # -*- coding: utf-8 -*-
+import os, hashlib, pickle
+from functools import lru_cache
+import numpy as np
+import joblib
+import janome
 from janome.tokenizer import Tokenizer
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer, TfidfTransformer
+from sklearn.pipeline import Pipeline
 
 _tokenizer = Tokenizer()
+_KEEP_POS = frozenset(['名詞','動詞','形容詞'])
+
+# タイトル SHA1 -> トークン列 のディスクキャッシュ（再学習時に Janome を回さない）
+TOKEN_CACHE_PATH = os.environ.get("YT_TOKEN_CACHE", os.path.join("data", "cache", "janome_tokens.pkl"))
+_TOKEN_CACHE_VERSION = f"janome-{getattr(janome, '__version__', '?')}:{','.join(sorted(_KEEP_POS))}"
+_disk_tokens = None
+_disk_dirty = False
+
+
+def _disk_cache():
+    global _disk_tokens
+    if _disk_tokens is None:
+        _disk_tokens = {}
+        if TOKEN_CACHE_PATH:
+            try:
+                with open(TOKEN_CACHE_PATH, 'rb') as f:
+                    data = pickle.load(f)
+                if data.get("version") == _TOKEN_CACHE_VERSION:
+                    _disk_tokens = data["tokens"]
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError):
+                pass
+    return _disk_tokens
+
+
+@lru_cache(maxsize=None)
+def _tokenize_cached(text: str):
+    global _disk_dirty
+    cache = _disk_cache()
+    key = hashlib.sha1(text.encode('utf-8')).hexdigest()
+    tokens = cache.get(key)
+    if tokens is None:
+        tokens = tuple(t.base_form for t in _tokenizer.tokenize(text)
+                       if t.part_of_speech.partition(',')[0] in _KEEP_POS)
+        cache[key] = tokens
+        _disk_dirty = True
+    return tokens
 
 def tokenize_japanese(text: str):
-    return [t.base_form for t in _tokenizer.tokenize(text)
-            if t.part_of_speech.split(',')[0] in ['名詞','動詞','形容詞']]
+    return list(_tokenize_cached(text))
+
+def save_token_cache(path=None):
+    """新しく解析したタイトルがあればトークンキャッシュを書き出す。"""
+    global _disk_dirty
+    path = path or TOKEN_CACHE_PATH
+    if not path or not _disk_dirty:
+        return
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({"version": _TOKEN_CACHE_VERSION, "tokens": _disk_cache()}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        _disk_dirty = False
+    except OSError as e:
+        print(f"Could not write token cache {path}: {e}")
+
+def build_vectorizer(max_features: int = 300, min_df=3, max_df=0.9, sublinear_tf: bool = True):
+    return TfidfVectorizer(tokenizer=tokenize_japanese, token_pattern=None, max_features=max_features,
+                           min_df=min_df, max_df=max_df, sublinear_tf=sublinear_tf, dtype=np.float32)
+
+def build_hashing_vectorizer(n_features: int = 2**14):
+    """語彙を持たない TF-IDF（HashingVectorizer + TfidfTransformer）。fit は IDF の計算だけで済む。"""
+    return Pipeline([
+        ("hv", HashingVectorizer(tokenizer=tokenize_japanese, token_pattern=None, n_features=n_features,
+                                 alternate_sign=False, norm=None, dtype=np.float32)),
+        ("tfidf", TfidfTransformer(sublinear_tf=True)),
+    ])
+
+def build_text_vectorizer(kind: str = "tfidf", max_features: int = 300, n_features: int = 2**14):
+    if kind == "tfidf":
+        return build_vectorizer(max_features=max_features)
+    if kind == "hashing":
+        return build_hashing_vectorizer(n_features=n_features)
+    raise ValueError(f"unknown text vectorizer: {kind!r}")
+
+def vectorizer_feature_names(vectorizer):
+    """学習済みベクトライザの列名（ハッシュ版はバケット番号）。"""
+    if isinstance(vectorizer, Pipeline):
+        return [f"tfidf_hash_{i}" for i in range(vectorizer.named_steps["hv"].n_features)]
+    return [f"tfidf_{w}" for w in vectorizer.get_feature_names_out()]
+
+# 学習済みベクトライザのキャッシュ。キーは (未学習ベクトライザのパラメータ, 学習タイトル) のハッシュ
+TFIDF_CACHE_DIR = os.environ.get("YT_TFIDF_CACHE", os.path.join("data", "cache", "tfidf"))
+
+def _fit_vectorizer(vectorizer, titles):
+    return vectorizer.fit(titles)
 
-def build_vectorizer(max_features: int = 300):
-    return TfidfVectorizer(tokenizer=tokenize_japanese, token_pattern=None, max_features=max_features)
+def fit_text_vectorizer(vectorizer, titles, cache_dir=TFIDF_CACHE_DIR):
+    """vectorizer を titles で fit する。同じ設定・同じタイトルなら 2 回目以降は joblib.Memory から読む。"""
+    titles = list(titles)
+    if not cache_dir:
+        return _fit_vectorizer(vectorizer, titles)
+    return joblib.Memory(cache_dir, verbose=0).cache(_fit_vectorizer)(vectorizer, titles)
@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
 
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 import numpy as np
 import cv2
 from PIL import Image
@@ -24,10 +27,50 @@ def _progress_logger(i, total, last_pct, step_pct=5):
         return pct
     return last_pct
 
-def ensure_thumbnail_features(df, verbose=True, step_pct=5):
+# サムネ URL -> 特徴量 のキャッシュ（parquet。pyarrow が無ければ pickle に置き換える）
+THUMB_CACHE_PATH = os.environ.get("YT_THUMB_CACHE", os.path.join("data", "cache", "thumb_features.parquet"))
+
+def _read_thumb_cache(path):
+    try:
+        cache = pd.read_parquet(path)
+    except ImportError:
+        try:
+            cache = pd.read_pickle(path + ".pkl")
+        except (OSError, ValueError, EOFError):
+            return {}
+    except (OSError, ValueError):
+        return {}
+    if "thumbnail" not in cache.columns or not set(THUMBNAIL_COLS).issubset(cache.columns):
+        return {}
+    # 特徴量の計算方法が変わっていたら古い値は使わない（版の無い古いキャッシュも捨てる）
+    if "version" not in cache.columns or not (cache["version"] == THUMB_FEATURES_VERSION).all():
+        return {}
+    # object 経由で取り出して列ごとの型（face_count は int）を保つ
+    return dict(zip(cache["thumbnail"], cache[THUMBNAIL_COLS].astype(object).values.tolist()))
+
+def _write_thumb_cache(path, cache):
+    out = pd.DataFrame(list(cache.values()), columns=THUMBNAIL_COLS)
+    out.insert(0, "thumbnail", list(cache.keys()))
+    out["version"] = THUMB_FEATURES_VERSION
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        try:
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            out.to_parquet(tmp_path, index=False)
+        except ImportError:
+            path = path + ".pkl"
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            out.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[yt_trendlab] サムネキャッシュを書き込めませんでした {path}: {e}")
+
+def ensure_thumbnail_features(df, verbose=True, step_pct=5, download_workers=32, compute_workers=None,
+                              cache_path=THUMB_CACHE_PATH):
     """
     既にTHUMBNAIL_COLSが揃っていればスキップ。
-    足りない場合は全行を計算し、進捗バーと%ログを出力する。
+    足りない場合はキャッシュに無いサムネだけを計算し、進捗バーと%ログを出力する。
+    compute_workers=None で CPU コア数ぶんのプロセスを使う。cache_path=None でキャッシュ無効。
     """
     if set(THUMBNAIL_COLS).issubset(df.columns):
         if verbose: print("[yt_trendlab] サムネ特徴: 既存列あり → 抽出スキップ")
@@ -36,19 +79,41 @@ def ensure_thumbnail_features(df, verbose=True, step_pct=5):
         raise ValueError("⚠️ 'thumbnail' 列がありません")
 
     urls = df["thumbnail"].tolist()
-    total = len(urls)
-    if verbose: print(f"[yt_trendlab] サムネ抽出開始: {total} 件")
+    cache = _read_thumb_cache(cache_path) if cache_path else {}
+    todo = list(dict.fromkeys(u for u in urls if u not in cache))
+    total = len(todo)
+    if verbose: print(f"[yt_trendlab] サムネ抽出開始: {total} 件（キャッシュ済み {sum(u in cache for u in urls)} 行）")
 
-    feats = []
+    # ダウンロードはスレッド、kmeans/mediapipe はプロセスで並列化。失敗したサムネはキャッシュしない
+    new_feats = {}
     bar = _TQDM(total=total, desc="🖼️ サムネ抽出", unit="img")
     last_pct = -step_pct
-    for i, url in enumerate(urls, start=1):
-        feats.append(extract_all_thumbnail_features_mediapipe(url))
-        bar.update(1)
-        if verbose:
-            last_pct = _progress_logger(i, total, last_pct, step_pct=step_pct)
+    compute_workers = compute_workers or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=download_workers) as dl_pool, \
+         ProcessPoolExecutor(max_workers=compute_workers) as cpu_pool:
+        dl_futs = {dl_pool.submit(_download, url): url for url in todo}
+        cpu_futs = {}
+        for fut in as_completed(dl_futs):
+            arr = fut.result()
+            if arr is not None:
+                cpu_futs[cpu_pool.submit(_compute_safe, arr)] = dl_futs[fut]
+        done = total - len(cpu_futs)
+        bar.update(done)
+        for fut in as_completed(cpu_futs):
+            feat = fut.result()
+            if feat is not None:
+                new_feats[cpu_futs[fut]] = feat
+            done += 1
+            bar.update(1)
+            if verbose:
+                last_pct = _progress_logger(done, total, last_pct, step_pct=step_pct)
     bar.close()
 
+    cache.update(new_feats)
+    if cache_path and new_feats:
+        _write_thumb_cache(cache_path, cache)
+    zeros = [0]*len(THUMBNAIL_COLS)
+    feats = [cache.get(u, zeros) for u in urls]
     feats_df = pd.DataFrame(feats, columns=THUMBNAIL_COLS)
     return pd.concat([df.reset_index(drop=True), feats_df], axis=1)
 
@@ -57,27 +122,56 @@ THUMBNAIL_COLS = [
     "r_mean","g_mean","b_mean","h_mean","s_mean","v_mean"
 ] + [f"color_ratio_{i}" for i in range(5)]
 
-def extract_all_thumbnail_features_mediapipe(url: str):
+def _download(url):
+    """サムネ画像を RGB 配列で取得（失敗時は None）。"""
     try:
         resp = requests.get(url, timeout=10)
-        img = Image.open(BytesIO(resp.content)).convert("RGB")
-        arr = np.array(img)
-        hsv = cv2.cvtColor(arr, cv2.COLOR_RGB2HSV)
-        brightness = hsv[:,:,2].mean()
-        r_mean, g_mean, b_mean = arr[:,:,0].mean(), arr[:,:,1].mean(), arr[:,:,2].mean()
-        h_mean, s_mean, v_mean = hsv[:,:,0].mean(), hsv[:,:,1].mean(), hsv[:,:,2].mean()
-        pixels = arr.reshape(-1,3).astype(np.float32)
-        criteria = (cv2.TERM_CRITERIA_EPS+cv2.TERM_CRITERIA_MAX_ITER, 100, 0.2)
-        _, labels, _ = cv2.kmeans(pixels, 5, None, criteria, 10, cv2.KMEANS_RANDOM_CENTERS)
-        counts = np.bincount(labels.flatten(), minlength=5)
-        color_ratios = (counts / counts.sum()).tolist()
-        gray = cv2.cvtColor(arr, cv2.COLOR_RGB2GRAY)
-        _, thresh = cv2.threshold(gray, 200, 255, cv2.THRESH_BINARY)
-        telop_ratio = float((thresh==255).sum()) / float(thresh.size)
-        with mp.solutions.face_detection.FaceDetection(model_selection=1, min_detection_confidence=0.5) as fd:
-            res = fd.process(cv2.cvtColor(arr, cv2.COLOR_RGB2BGR))
-            face_count = len(res.detections) if res.detections else 0
-        return [brightness, face_count, telop_ratio,
-                r_mean, g_mean, b_mean, h_mean, s_mean, v_mean] + color_ratios
+        return np.array(Image.open(BytesIO(resp.content)).convert("RGB"))
     except Exception:
-        return [0]*len(THUMBNAIL_COLS)
+        return None
+
+KMEANS_STRIDE = 4
+# サムネキャッシュの版。_compute の計算内容（間引き幅・MediaPipe への入力や設定）を変えたら更新する
+THUMB_FEATURES_VERSION = f"kmeans-stride{KMEANS_STRIDE}:mediapipe-rgb-sel1-conf0.5:cv2mean"
+
+# FaceDetection はプロセスごとに1回だけ生成して使い回す（グラフ初期化が重いため）
+_FD = None
+_FD_LOCK = threading.Lock()
+
+def _face_detector():
+    global _FD
+    if _FD is None:
+        _FD = mp.solutions.face_detection.FaceDetection(model_selection=1, min_detection_confidence=0.5)
+    return _FD
+
+def _compute(arr):
+    hsv = cv2.cvtColor(arr, cv2.COLOR_RGB2HSV)
+    # チャンネル平均は cv2.mean で 1 回ずつ（numpy の strided な axis 指定平均より速い）
+    r_mean, g_mean, b_mean = cv2.mean(arr)[:3]
+    h_mean, s_mean, v_mean = cv2.mean(hsv)[:3]
+    brightness = v_mean
+    # 5色比は画素の割合なので、縦横 KMEANS_STRIDE 間引いた画素で kmeans しても十分
+    pixels = arr[::KMEANS_STRIDE, ::KMEANS_STRIDE].reshape(-1,3).astype(np.float32)
+    criteria = (cv2.TERM_CRITERIA_EPS+cv2.TERM_CRITERIA_MAX_ITER, 100, 0.2)
+    _, labels, _ = cv2.kmeans(pixels, 5, None, criteria, 10, cv2.KMEANS_RANDOM_CENTERS)
+    counts = np.bincount(labels.flatten(), minlength=5)
+    color_ratios = (counts / counts.sum()).tolist()
+    gray = cv2.cvtColor(arr, cv2.COLOR_RGB2GRAY)
+    _, thresh = cv2.threshold(gray, 200, 255, cv2.THRESH_BINARY)
+    telop_ratio = float((thresh==255).sum()) / float(thresh.size)
+    with _FD_LOCK:
+        res = _face_detector().process(arr)  # mediapipe solutions は RGB 入力
+    face_count = len(res.detections) if res.detections else 0
+    return [brightness, face_count, telop_ratio,
+            r_mean, g_mean, b_mean, h_mean, s_mean, v_mean] + color_ratios
+
+def _compute_safe(arr):
+    try:
+        return _compute(arr)
+    except Exception:
+        return None
+
+def extract_all_thumbnail_features_mediapipe(url: str):
+    arr = _download(url)
+    feat = _compute_safe(arr) if arr is not None else None
+    return feat if feat is not None else [0]*len(THUMBNAIL_COLS)
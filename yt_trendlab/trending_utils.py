@@ -16,9 +16,9 @@ def _load_trend_modules():
             build_trend_vocab_from_csvs as _build_vocab,
             save_trend_vocab_json as _save_vocab,
             load_trend_vocab_json as _load_vocab,
-            title_trend_features as _title_feats,
+            TrendScorer as _TrendScorer,
         )
-        return _fetch, _build_vocab, _save_vocab, _load_vocab, _title_feats
+        return _fetch, _build_vocab, _save_vocab, _load_vocab, _TrendScorer
     except ModuleNotFoundError:
         base = pathlib.Path.cwd() / "code"
         gt, tf = base / "get_trending.py", base / "trend_features.py"
@@ -28,10 +28,10 @@ def _load_trend_modules():
         if gt.exists() and tf.exists():
             gt = _load("yt_trend_get_trending", gt)
             tf = _load("yt_trend_trend_features", tf)
-            return gt.fetch_trending, tf.build_trend_vocab_from_csvs, tf.save_trend_vocab_json, tf.load_trend_vocab_json, tf.title_trend_features
+            return gt.fetch_trending, tf.build_trend_vocab_from_csvs, tf.save_trend_vocab_json, tf.load_trend_vocab_json, tf.TrendScorer
         raise
 
-_fetch, _build_vocab, _save_vocab, _load_vocab, _title_feats = _load_trend_modules()
+_fetch, _build_vocab, _save_vocab, _load_vocab, _TrendScorer = _load_trend_modules()
 
 def ensure_trending_snapshot_if_missing(api_key_env="YT_API_KEY", region="JP", max_results=200, category_id=None):
     csvs = glob.glob(TREND_CSV_GLOB)
@@ -85,7 +85,8 @@ def add_trend_features(titles: pd.Series, verbose=True) -> pd.DataFrame:
     else:
         hot, trend_titles = _build_vocab(csvs, top_k=TREND_TOPK)
         _save_vocab(hot, TREND_VOCAB_PATH)
-    feats = titles.fillna("").apply(lambda t: _title_feats(t, hot, trend_titles_for_bow=trend_titles))
+    # 急上昇側の BoW は一度だけ作り、全タイトルをまとめて計算する
+    feats = _TrendScorer(hot, trend_titles_for_bow=trend_titles).features(titles.fillna("").tolist())
     if verbose:
         print("[yt_trendlab] Trend features done.")
-    return pd.DataFrame(list(feats.values))
+    return feats